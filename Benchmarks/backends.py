@@ -0,0 +1,104 @@
+'''
+NER backend benchmark: latency and entity agreement of the inference backends
+
+Runs the NER stage (sliding windows, as in `ResumeParser`) of every resume
+of Data/traindata.json with each backend. The first backend is the
+reference: the others are compared with it token by token (same label
+on the same characters) and entity by entity (F1 of the entities after
+`utils.preprocess_bert_output`).
+
+Usage:
+    python -m Benchmarks.backends [--backends torch,torch-int8,onnx] [--model-dir DIR]
+                                  [--limit N] [--batch-size N] [--threads N]
+'''
+import time
+import argparse
+
+from Modules import constants as cs
+from Modules import inference
+from Modules import utils
+from Benchmarks.skills import load_corpus
+from Benchmarks.suite import percentile
+
+
+def token_labels(output: list) -> dict:
+    return {(item['start'], item['end']): item['entity'] for item in output if item['entity'] not in ('None', 'O')}
+
+
+def entity_set(output: list) -> set:
+    return {(item['entity'], ' '.join(item['text'].lower().split())) for item in utils.preprocess_bert_output(output)}
+
+
+def agreement(reference: list, outputs: list) -> tuple[float, float]:
+    '''
+    Token label agreement and entity F1 of the outputs against the reference outputs
+    '''
+    same_tokens = all_tokens = 0
+    true_positives = predicted = gold = 0
+    for reference_output, output in zip(reference, outputs):
+        reference_labels, labels = token_labels(reference_output), token_labels(output)
+        all_tokens += len(reference_labels.keys() | labels.keys())
+        same_tokens += sum(1 for span, label in labels.items() if reference_labels.get(span) == label)
+
+        reference_entities, entities = entity_set(reference_output), entity_set(output)
+        true_positives += len(reference_entities & entities)
+        predicted += len(entities)
+        gold += len(reference_entities)
+
+    token_agreement = same_tokens / all_tokens if all_tokens else 1.0
+    f1 = 2 * true_positives / (predicted + gold) if predicted + gold else 1.0
+    return token_agreement, f1
+
+
+def run_backend(backend: str, texts: list, args) -> tuple[float, list, list]:
+    start = time.perf_counter()
+    nlp = inference.load_ner_pipeline(cs.NER_MODEL, args.model_dir, backend)
+    load_seconds = time.perf_counter() - start
+
+    # Warm up (first calls allocate buffers and, for ONNX Runtime, optimize the graph)
+    inference.run_ner(nlp, texts[:2], cs.NER_WINDOW, cs.NER_OVERLAP, args.batch_size)
+
+    latencies, outputs = [], []
+    for text in texts:
+        start = time.perf_counter()
+        outputs.append(inference.run_ner(nlp, [text], cs.NER_WINDOW, cs.NER_OVERLAP, args.batch_size)[0])
+        latencies.append(time.perf_counter() - start)
+
+    return load_seconds, latencies, outputs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--backends', default=','.join(cs.NER_BACKENDS))
+    arg_parser.add_argument('--model-dir', default=None)
+    arg_parser.add_argument('--limit', type=int, default=None)
+    arg_parser.add_argument('--batch-size', type=int, default=1)
+    arg_parser.add_argument('--threads', type=int, default=None, help="torch intra-op threads")
+    args = arg_parser.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    texts = load_corpus()[:args.limit]
+    backends = args.backends.split(',')
+
+    print(f"resumes: {len(texts)}, window: {cs.NER_WINDOW}, overlap: {cs.NER_OVERLAP}, batch size: {args.batch_size}")
+    print(f"{'backend':<12}{'load (s)':>10}{'mean (ms)':>11}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+          f"{'speedup':>9}{'token agr.':>12}{'entity F1':>11}")
+
+    reference = None
+    for backend in backends:
+        load_seconds, latencies, outputs = run_backend(backend, texts, args)
+        mean = sum(latencies) / len(latencies)
+        if reference is None:
+            reference = (mean, outputs)
+
+        token_agreement, f1 = agreement(reference[1], outputs)
+        print(f"{backend:<12}{load_seconds:>10.1f}{mean * 1e3:>11.1f}{percentile(latencies, 50) * 1e3:>10.1f}"
+              f"{percentile(latencies, 95) * 1e3:>10.1f}{reference[0] / mean:>8.2f}x"
+              f"{token_agreement:>12.3f}{f1:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
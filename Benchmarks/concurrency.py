@@ -0,0 +1,56 @@
+'''
+Concurrency stress test: one shared `ResumeParser` serving many threads
+
+Every resume of Data/traindata.json is parsed once serially, then again
+from many threads at the same time through the same parser instance.
+The run fails if any concurrent result differs from its serial result.
+
+Usage:
+    python -m Benchmarks.concurrency [--threads N] [--rounds N] [--limit N]
+'''
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from resume_analyzer import init_parser
+from Benchmarks.skills import load_corpus
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--threads', type=int, default=8)
+    arg_parser.add_argument('--rounds', type=int, default=3)
+    arg_parser.add_argument('--limit', type=int, default=None, help="number of resumes used from the corpus")
+    args = arg_parser.parse_args()
+
+    texts = load_corpus()[:args.limit]
+    parser = init_parser()
+
+    start = time.perf_counter()
+    expected = [parser.parse(text) for text in texts]
+    serial_time = time.perf_counter() - start
+
+    def parse_and_check(index):
+        result = parser.parse(texts[index])
+        # The last result of a thread must be its own, whatever the other threads parsed
+        return result == expected[index] and parser.get_extracted_data() is result
+
+    jobs = [index for _ in range(args.rounds) for index in range(len(texts))]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        checks = list(executor.map(parse_and_check, jobs))
+    concurrent_time = time.perf_counter() - start
+
+    failures = checks.count(False)
+    print(f"resumes: {len(texts)}, threads: {args.threads}, parses: {len(jobs)}")
+    print(f"serial: {serial_time / len(texts) * 1000:.1f} ms/resume, "
+          f"concurrent: {concurrent_time / len(jobs) * 1000:.1f} ms/resume")
+    print(f"mismatching results: {failures}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
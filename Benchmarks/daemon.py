@@ -0,0 +1,137 @@
+'''
+Daemon benchmark: cold script vs warm `ParserDaemon`
+
+A short-lived script parsing one resume (new Python process, `init_parser`,
+`parse`) is timed against the same resume sent to a running daemon by the
+`python -m Modules.daemon parse` command and by a `DaemonClient` in the
+current process. The resumes of Data/traindata.json are then sent one
+request at a time and pipelined (see `DaemonClient.imap`), and checked
+against a local parser (run in another process with the same hash seed,
+as some fields come from sets).
+
+Usage:
+    python -m Benchmarks.daemon [--runs N] [--resumes N] [--model-dir DIR]
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from Modules import constants as cs
+from Modules.daemon import DaemonClient
+from Benchmarks.skills import load_corpus
+
+
+COLD_SCRIPT = '''
+import sys
+from resume_analyzer import init_parser
+init_parser(model_dir=sys.argv[2] or None).parse(open(sys.argv[1], encoding='utf-8').read())
+'''
+
+EXPECTED_SCRIPT = '''
+import sys, json
+from resume_analyzer import init_parser
+from Benchmarks.skills import load_corpus
+parser = init_parser(model_dir=sys.argv[2] or None)
+print(json.dumps([parser.parse(text) for text in load_corpus()[:int(sys.argv[1])]]))
+'''
+
+HASH_SEED = dict(os.environ, PYTHONHASHSEED='0')
+
+
+def run(command, runs: int) -> float:
+    # Best wall time of a command, in seconds
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, cwd=cs.workspace_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def wait_for(path: str, daemon: subprocess.Popen, timeout: float = 300):
+    deadline = time.time() + timeout
+    while time.time() < deadline and daemon.poll() is None:
+        try:
+            with DaemonClient(path) as client:
+                if client.ping():
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("The daemon did not start")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--runs', type=int, default=3)
+    arg_parser.add_argument('--resumes', type=int, default=50)
+    arg_parser.add_argument('--model-dir', default=None)
+    args = arg_parser.parse_args()
+
+    texts = load_corpus()[:args.resumes]
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'daemon.sock')
+    resume_file = os.path.join(directory, 'resume.txt')
+    with open(resume_file, 'w', encoding='utf-8') as text_file:
+        text_file.write(texts[0])
+
+    cold = run([sys.executable, '-c', COLD_SCRIPT, resume_file, args.model_dir or ''], args.runs)
+
+    command = [sys.executable, '-m', 'Modules.daemon', 'serve', '--socket', path]
+    if args.model_dir:
+        command += ['--model-dir', args.model_dir]
+    start = time.perf_counter()
+    daemon = subprocess.Popen(command, cwd=cs.workspace_dir, stderr=subprocess.DEVNULL, env=HASH_SEED)
+    try:
+        wait_for(path, daemon)
+        startup = time.perf_counter() - start
+
+        # The command line client gets the text on stdin
+        client_command = [sys.executable, '-m', 'Modules.daemon', 'parse', '--socket', path, '-']
+        best = None
+        for _ in range(args.runs):
+            with open(resume_file, encoding='utf-8') as stdin:
+                start = time.perf_counter()
+                subprocess.run(client_command, check=True, cwd=cs.workspace_dir, stdin=stdin, stdout=subprocess.DEVNULL)
+                seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        cli = best
+
+        with DaemonClient(path) as client:
+            start = time.perf_counter()
+            client.parse(texts[0])
+            in_process = time.perf_counter() - start
+
+            start = time.perf_counter()
+            sequential = [client.parse(text) for text in texts]
+            sequential_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pipelined = client.parse_many(texts)
+            pipelined_seconds = time.perf_counter() - start
+
+            client.shutdown()
+        daemon.wait(timeout=60)
+    finally:
+        if daemon.poll() is None:
+            daemon.kill()
+
+    expected = json.loads(subprocess.run([sys.executable, '-c', EXPECTED_SCRIPT, str(len(texts)), args.model_dir or ''],
+                                         check=True, cwd=cs.workspace_dir, env=HASH_SEED, capture_output=True).stdout)
+    same = sequential == expected and pipelined == expected
+
+    print(f"daemon startup: {startup:.2f} s")
+    print(f"one resume, cold script (init_parser + parse): {cold * 1000:8.0f} ms")
+    print(f"one resume, daemon command line client:        {cli * 1000:8.0f} ms ({cold / cli:.1f}x)")
+    print(f"one resume, DaemonClient (warm):               {in_process * 1000:8.0f} ms")
+    print(f"{len(texts)} resumes one request at a time: {sequential_seconds / len(texts) * 1000:.1f} ms/resume")
+    print(f"{len(texts)} resumes pipelined:             {pipelined_seconds / len(texts) * 1000:.1f} ms/resume")
+    print(f"same results as a local parser: {same}")
+
+
+if __name__ == '__main__':
+    main()
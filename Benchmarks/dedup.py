@@ -0,0 +1,154 @@
+'''
+Near-duplicate benchmark: `NearDuplicateIndex` recall, false positives and cost
+
+The resumes of Data/traindata.json are added to an index (with a stand-in
+NER output naming the first word of the resume as a person), after
+`--documents` filler documents so the lookups run against a large index.
+Edited copies of every resume are then looked up, and must find their
+original:
+- date: the years of one line shifted by one (e.g. an updated end date)
+- reorder: two sections swapped (two halves of the lines without sections)
+- export: the layout of another export tool (tabs, double spaces, blank lines)
+Mixed documents (half of the lines of two resumes) and the filler
+documents of another seed must find nothing. The time of the text
+cleaning, regexes and sections (still run for the near duplicates) is
+printed for comparison.
+
+Usage:
+    python -m Benchmarks.dedup [--documents N] [--path index.sqlite]
+'''
+import os
+import re
+import time
+import random
+import argparse
+
+from Modules import extractors, utils
+from Modules.dedup import NearDuplicateIndex
+from Modules.document import TextDocument
+from Benchmarks.skills import load_corpus
+
+
+YEAR_REGEX = re.compile(r'\b(19|20)(\d\d)\b')
+
+
+def clean(text: str) -> str:
+    # Same text as the parser gives the NER model
+    return utils.encode_text(extractors.extract_text(text).strip())
+
+
+def stand_in_output(text: str) -> list[dict]:
+    word = text.split()[0]
+    return [{'entity': 'B-PER', 'word': word, 'start': 0, 'end': len(word)}]
+
+
+def shift_dates(text: str) -> str:
+    match = YEAR_REGEX.search(text)
+    if match is None:
+        return text + '\nUpdated 2025'
+
+    start, end = text.rfind('\n', 0, match.start()) + 1, text.find('\n', match.start())
+    end = len(text) if end < 0 else end
+    return text[:start] + YEAR_REGEX.sub(lambda year: str(int(year.group()) + 1), text[start:end]) + text[end:]
+
+
+def swap_sections(text: str) -> str:
+    document = TextDocument(text)
+    spans = sorted(document.sections.values())
+    if len(spans) < 2:
+        lines = text.split('\n')
+        half = len(lines) // 2
+        return '\n'.join(lines[:1] + lines[half:] + lines[1:half])
+
+    # The last two sections (with their headers) change places
+    (previous, _), (start, end) = spans[-2], spans[-1]
+    previous = document.line_starts[document.line_of(previous) - 1]
+    header = document.line_starts[document.line_of(start) - 1]
+    return text[:previous] + text[header:end] + '\n' + text[previous:header].rstrip('\n')
+
+
+def reexport(text: str, rng: random.Random) -> str:
+    lines = []
+    for line in text.split('\n'):
+        lines.append(line.replace(' ', '  ' if rng.random() < 0.5 else '\t'))
+        if rng.random() < 0.3:
+            lines.append('')
+    return '\n'.join(lines)
+
+
+def mix(texts: list[str], rng: random.Random) -> str:
+    first, second = rng.sample(texts, 2)
+    first, second = first.split('\n'), second.split('\n')
+    return '\n'.join(first[:len(first) // 2] + second[len(second) // 2:])
+
+
+def filler(texts: list[str], rng: random.Random) -> str:
+    # Lines drawn from many resumes
+    lines = [line for text in rng.sample(texts, 8) for line in text.split('\n')]
+    return '\n'.join(rng.sample(lines, min(40, len(lines))))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--documents', type=int, default=20000)
+    arg_parser.add_argument('--path', default=None)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [clean(text) for text in load_corpus()]
+    texts = list(dict.fromkeys(text for text in texts if text))
+    if args.path and os.path.exists(args.path):
+        os.remove(args.path)
+    index = NearDuplicateIndex(args.path)
+
+    start = time.perf_counter()
+    for _ in range(args.documents):
+        text = filler(texts, rng)
+        index.add(index.signature(text), stand_in_output(text))
+    fill_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    signatures = [index.signature(text) for text in texts]
+    signature_seconds = (time.perf_counter() - start) / len(texts)
+
+    start = time.perf_counter()
+    for signature, text in zip(signatures, texts):
+        index.add(signature, stand_in_output(text))
+    add_seconds = (time.perf_counter() - start) / len(texts)
+
+    print(f"{len(index)} documents indexed ({len(texts)} resumes), "
+          f"{fill_seconds / max(1, args.documents) * 1000:.2f} ms/document")
+    print(f"signature: {signature_seconds * 1000:.2f} ms, add: {add_seconds * 1000:.2f} ms")
+
+    edits = {'date': shift_dates, 'reorder': swap_sections, 'export': lambda text: reexport(text, rng)}
+    for name, edit in edits.items():
+        found, seconds = 0, 0
+        for text in texts:
+            edited = clean(edit(text))
+            start = time.perf_counter()
+            match = index.lookup(index.signature(edited), edited)
+            seconds += time.perf_counter() - start
+            found += match is not None and match[0][0]['word'] == text.split()[0]
+        print(f"{name:8} copies found: {found}/{len(texts)} ({seconds / len(texts) * 1000:.2f} ms/lookup)")
+
+    other = random.Random(1)
+    negatives = [mix(texts, other) for _ in range(len(texts))] + [filler(texts, other) for _ in range(len(texts))]
+    false_positives = sum(index.lookup(index.signature(text), text) is not None for text in negatives)
+    print(f"false positives: {false_positives}/{len(negatives)} (mixed and filler documents)")
+
+    start = time.perf_counter()
+    for text in texts:
+        document = TextDocument(clean(text))
+        extractors.extract_email(document.text)
+        extractors.extract_mobile_numbers(document.text)
+        document.sections
+    print(f"text cleaning, regexes and sections (run on hits too): "
+          f"{(time.perf_counter() - start) / len(texts) * 1000:.2f} ms/resume")
+
+    if args.path:
+        print(f"index file: {os.path.getsize(args.path) / 1024 / 1024:.1f} MB")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+'''
+Dictionaries benchmark: CSV sets vs memory-mapped compact dictionaries
+
+Each mode loads the skill and company dictionaries and builds their
+matchers in a fresh process (load time and RSS added), then times the
+skill and company matching of every resume of Data/traindata.json. The
+results of both modes are checked to be identical. The compact
+dictionaries are built first if they are missing.
+
+Usage:
+    python -m Benchmarks.dictionaries [--repeat N]
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from Modules import dictionaries, utils
+from Modules.memory import get_rss
+from Benchmarks.skills import load_corpus
+
+
+def run_mode(mode: str, repeat: int):
+    rss = get_rss()
+    start = time.perf_counter()
+    if mode == 'csv':
+        skills = utils.load_csv_column(dictionaries.SKILLS_FILE, 'Skill')
+        companies = utils.load_csv_column(dictionaries.COMPANIES_FILE, 'Company')
+    else:
+        skills = dictionaries.load_dictionary(dictionaries.SKILLS_FILE, 'Skill')
+        companies = dictionaries.load_dictionary(dictionaries.COMPANIES_FILE, 'Company')
+    skill_index = dictionaries.get_skill_index(skills)
+    company_matcher = dictionaries.get_company_matcher(companies)
+    load_seconds = time.perf_counter() - start
+    rss = get_rss() - rss
+
+    texts = load_corpus()
+    timings = {}
+    for name, match in (('skills', skill_index.find), ('companies', company_matcher.find_words)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = [match(text) for text in texts]
+            best = min(best, time.perf_counter() - start)
+        timings[name] = (best * 1000 / len(texts), results)
+
+    return {'load_ms': load_seconds * 1000, 'rss_mb': rss / 1024 / 1024,
+            'skills_ms': timings['skills'][0], 'companies_ms': timings['companies'][0],
+            'results': [timings['skills'][1], timings['companies'][1]]}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--mode', choices=('csv', 'compact'), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.repeat)))
+        return
+
+    for csv_file in (dictionaries.SKILLS_FILE, dictionaries.COMPANIES_FILE):
+        if not os.path.exists(dictionaries.get_dictionary_path(csv_file)):
+            dictionaries.main()
+            break
+
+    # Every mode runs in its own process, so its load time and RSS are measured from scratch
+    runs = {}
+    for mode in ('csv', 'compact'):
+        output = subprocess.run([sys.executable, '-m', 'Benchmarks.dictionaries', '--mode', mode, '--repeat', str(args.repeat)],
+                                check=True, capture_output=True, text=True).stdout
+        runs[mode] = json.loads(output.splitlines()[-1])
+
+    print(f"{'mode':<10}{'load (ms)':>11}{'RSS (MB)':>10}{'skills (ms/resume)':>20}{'companies (ms/resume)':>23}")
+    for mode, run in runs.items():
+        print(f"{mode:<10}{run['load_ms']:>11.1f}{run['rss_mb']:>10.1f}{run['skills_ms']:>20.2f}{run['companies_ms']:>23.2f}")
+    print(f"identical results: {runs['csv']['results'] == runs['compact']['results']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+'''
+Experience benchmark: strptime/relativedelta date ranges vs the month index engine
+
+Times the total experience of every resume of Data/traindata.json as it
+used to be computed (unguarded pattern, two `strptime` calls and a
+`relativedelta` per range, the current date formatted for every
+"present") and with `accumolators.get_total_experience`. The totals are
+checked against the previous ones; the resumes whose total changes when
+overlapping ranges are merged are counted.
+
+Usage:
+    python -m Benchmarks.experience [--repeat N] [--ranges-only]
+'''
+import re
+import time
+import argparse
+from datetime import datetime
+from dateutil import relativedelta
+
+from Modules import accumolators
+from Benchmarks.skills import load_corpus
+
+
+PREVIOUS_EXPERIENCE_PATTERN = r'(?P<fmonth>\w+. ?\d+)\s*(\D|to)\s*(?P<smonth>\w+. ?\d+|present)'
+
+
+def previous_number_of_months(date1, date2):
+    if date2.lower() == 'present':
+        date2 = datetime.now().strftime('%b %Y')
+    try:
+        if len(date1.split()[0]) > 3:
+            date1 = date1.split()
+            date1 = date1[0][:3] + ' ' + date1[1]
+        if len(date2.split()[0]) > 3:
+            date2 = date2.split()
+            date2 = date2[0][:3] + ' ' + date2[1]
+    except IndexError:
+        return 0
+    try:
+        date1 = datetime.strptime(str(date1), '%b %Y')
+        date2 = datetime.strptime(str(date2), '%b %Y')
+        months_of_experience = relativedelta.relativedelta(date2, date1)
+        months_of_experience = (months_of_experience.years
+                                * 12 + months_of_experience.months)
+    except ValueError:
+        return 0
+    return months_of_experience
+
+
+def previous_total_experience(experience_list):
+    exp_ = []
+    for line in experience_list:
+        experience = re.search(PREVIOUS_EXPERIENCE_PATTERN, line, re.I)
+        if experience:
+            exp_.append(experience.groups())
+
+    return sum([abs(previous_number_of_months(i[0], i[2])) for i in exp_])
+
+
+def total_experiences(experience_lists, merge_overlaps=False):
+    return [accumolators.get_total_experience(lines, merge_overlaps) for lines in experience_lists]
+
+
+def run(func, inputs, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(inputs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--ranges-only', action='store_true',
+                            help="keep only the lines containing a date range, as in a parsed experience section")
+    args = arg_parser.parse_args()
+
+    experience_lists = [text.split('\n') for text in load_corpus()]
+    if args.ranges_only:
+        experience_lists = [[line for line in lines if re.search(PREVIOUS_EXPERIENCE_PATTERN, line, re.I)]
+                            for lines in experience_lists]
+
+    previous = [previous_total_experience(lines) for lines in experience_lists]
+    current = total_experiences(experience_lists)
+    assert previous == current, "Total experience differs from the previous computation"
+    merged = total_experiences(experience_lists, merge_overlaps=True)
+
+    lines = sum(len(lines) for lines in experience_lists)
+    print(f"resumes: {len(experience_lists)}, lines: {lines}, best of {args.repeat} runs")
+    before = run(lambda inputs: [previous_total_experience(lines) for lines in inputs], experience_lists, args.repeat)
+    after = run(total_experiences, experience_lists, args.repeat)
+    print(f"{'before (us/resume)':>20}{'after (us/resume)':>20}{'speedup':>10}")
+    print(f"{before * 1e6 / len(experience_lists):>20.1f}{after * 1e6 / len(experience_lists):>20.1f}"
+          f"{before / after:>9.1f}x")
+
+    changed = sum(1 for total, merged_total in zip(current, merged) if total != merged_total)
+    print(f"resumes with overlapping ranges (total lowered by merge_overlaps): {changed}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+'''
+Memory benchmark: steady-state RSS and latency over many parses
+
+The resumes of Data/traindata.json are parsed in a loop (10,000 parses by
+default) with a given garbage collection strategy, and the RSS is sampled
+along the way. `per-parse` reproduces the previous `gc.collect()` after
+every document.
+
+Usage:
+    python -m Benchmarks.memory [--parses N] [--strategy per-parse|periodic|watermark]
+                                [--collect-every N] [--watermark-mb N] [--sample-every N]
+'''
+import time
+import argparse
+
+from resume_analyzer import init_parser
+from Modules.memory import MemoryManager, get_rss
+from Benchmarks.skills import load_corpus
+
+
+def make_memory_manager(args) -> MemoryManager:
+    if args.strategy == 'per-parse':
+        return MemoryManager(collect_every=1, rss_watermark=None)
+    if args.strategy == 'watermark':
+        return MemoryManager(collect_every=None, rss_watermark=args.watermark_mb * 1024 * 1024)
+    return MemoryManager(collect_every=args.collect_every, rss_watermark=None)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--parses', type=int, default=10000)
+    arg_parser.add_argument('--strategy', choices=('per-parse', 'periodic', 'watermark'), default='periodic')
+    arg_parser.add_argument('--collect-every', type=int, default=1000)
+    arg_parser.add_argument('--watermark-mb', type=int, default=1024)
+    arg_parser.add_argument('--sample-every', type=int, default=500)
+    args = arg_parser.parse_args()
+
+    texts = load_corpus()
+    memory_manager = make_memory_manager(args)
+    parser = init_parser(lazy=False, memory_manager=memory_manager)
+
+    mb = lambda size: size / 1024 / 1024
+    print(f"strategy: {args.strategy}, parses: {args.parses}, RSS after loading: {mb(get_rss()):.0f} MB")
+    print(f"{'parses':>8}{'RSS (MB)':>10}{'ms/parse':>10}")
+
+    samples = []
+    start = time.perf_counter()
+    for i in range(1, args.parses + 1):
+        parser.parse(texts[i % len(texts)])
+
+        if i % args.sample_every == 0:
+            elapsed = time.perf_counter() - start
+            samples.append(get_rss())
+            print(f"{i:>8}{mb(samples[-1]):>10.0f}{elapsed * 1000 / args.sample_every:>10.2f}")
+            start = time.perf_counter()
+
+    steady = samples[len(samples) // 2:]
+    if steady:
+        print(f"steady state RSS (second half): min {mb(min(steady)):.0f} MB, max {mb(max(steady)):.0f} MB, "
+              f"growth {mb(steady[-1] - steady[0]):+.1f} MB")
+    print(f"full collections: {memory_manager.collections}")
+
+
+if __name__ == '__main__':
+    main()
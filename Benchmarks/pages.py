@@ -0,0 +1,67 @@
+'''
+PDF pages benchmark: full decoding vs page budgets and page workers
+
+A PDF of `--pages` pages (one resume of Data/traindata.json per page) is
+built in memory, then loaded as a `ResumeDocument` with every budget and
+number of page workers. The time until the first page is available is
+measured with `document.iter_pdf_pages`. The decoded text is checked
+against the sequential decoding.
+
+Usage:
+    python -m Benchmarks.pages [--pages N] [--workers 2,4] [--repeat N]
+'''
+import io
+import time
+import argparse
+import pymupdf
+
+from Modules.document import ResumeDocument, iter_pdf_pages
+from Benchmarks.skills import load_corpus
+
+
+def build_pdf(pages: int) -> bytes:
+    texts = load_corpus()
+    with pymupdf.open() as pdf_document:
+        for i in range(pages):
+            page = pdf_document.new_page()
+            page.insert_textbox(pymupdf.Rect(36, 36, 560, 800), texts[i % len(texts)][:3500], fontsize=7)
+        return pdf_document.tobytes()
+
+
+def best_time(function, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--pages', type=int, default=40)
+    arg_parser.add_argument('--workers', default='2,4')
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    data = build_pdf(args.pages)
+    reference = ResumeDocument(io.BytesIO(data), 'pdf').text
+
+    modes = [('all pages', {}), ('max_pages=3', {'max_pages': 3}), ('max_chars=10000', {'max_chars': 10000})]
+    modes += [(f'page_workers={workers}', {'page_workers': int(workers)}) for workers in args.workers.split(',')]
+
+    print(f"{args.pages} pages, {len(data) / 1024:.0f} KB")
+    print(f"{'mode':<18}{'load (ms)':>11}{'page 1 (ms)':>13}{'same text':>11}")
+    for name, kwargs in modes:
+        document = ResumeDocument(io.BytesIO(data), 'pdf', **kwargs)
+        same = reference.startswith(document.text) if 'page_workers' not in kwargs else document.text == reference
+
+        load = best_time(lambda: ResumeDocument(io.BytesIO(data), 'pdf', **kwargs), args.repeat)
+        budgets = {'max_pages': kwargs.get('max_pages'), 'max_chars': kwargs.get('max_chars'), 'workers': kwargs.get('page_workers', 0)}
+        first_page = best_time(lambda: next(iter_pdf_pages(data, **budgets)), args.repeat)
+
+        print(f"{name:<18}{load:>11.1f}{first_page:>13.1f}{str(same):>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+'''
+Ranking benchmark: Python set intersections vs `CandidateRanker`
+
+The skills, companies, degree and experience of the resumes of
+Data/traindata.json are extracted with the dictionary and regex
+extractors (no NER model), then resampled into `--candidates` candidates
+(a random part of the skills and companies of a resume, jittered
+experience). Jobs are built from random skill sets. Every job is ranked
+with a loop of set intersections over the parsed details (same scores as
+`CandidateRanker`) and with `CandidateRanker.rank`, and the top-k lists
+are compared.
+
+Usage:
+    python -m Benchmarks.ranking [--candidates N] [--jobs N] [--k N]
+'''
+import time
+import random
+import argparse
+
+from Modules import constants as cs
+from Modules import extractors, accumolators, dictionaries, utils
+from Modules.document import TextDocument
+from Modules.ranking import CandidateRanker, get_degree_level
+from Benchmarks.skills import load_corpus
+
+
+def extract_profiles(texts):
+    skill_index = dictionaries.get_skill_index(dictionaries.load_dictionary(dictionaries.SKILLS_FILE, 'Skill'))
+    company_matcher = dictionaries.get_company_matcher(dictionaries.load_dictionary(dictionaries.COMPANIES_FILE, 'Company'))
+
+    profiles = []
+    for text in texts:
+        text = utils.encode_text(extractors.extract_text(text).strip())
+        months = accumolators.get_total_experience(TextDocument(text).section_lines('experience'))
+        profiles.append({'skills': extractors.find_skills(text, skill_index),
+                         'companies': extractors.extract_companies(text, company_matcher),
+                         'degree': extractors.extract_highest_degree(text),
+                         'experience': round(months / 12, 2)})
+    return profiles
+
+
+def resample(profiles, count: int, rng: random.Random):
+    for i in range(count):
+        profile = rng.choice(profiles)
+        yield i, {'skills': [skill for skill in profile['skills'] if rng.random() < 0.7],
+                  'companies': [company for company in profile['companies'] if rng.random() < 0.7],
+                  'degree': profile['degree'],
+                  'experience': round(profile['experience'] * rng.uniform(0.5, 1.5), 2)}
+
+
+def set_rank(candidates, skills, min_years, degree, k, weights=cs.RANKING_WEIGHTS):
+    # Previous approach: one set intersection per candidate (`candidates` hold their normalized skills)
+    job_skills = {utils.preprocess_skill(skill) for skill in skills}
+    degree_level = get_degree_level(degree)
+    total_weight = weights['skills'] + weights['experience'] + weights['degree']
+
+    scores = []
+    for candidate_id, candidate_skills, years, level in candidates:
+        score = weights['skills'] * len(job_skills & candidate_skills) / len(job_skills)
+        score += weights['experience'] * min(years / min_years, 1)
+        score += weights['degree'] * (level >= degree_level)
+        scores.append((score / total_weight, candidate_id))
+
+    scores.sort(key=lambda item: -item[0])
+    return [(candidate_id, score) for score, candidate_id in scores[:k]]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--candidates', type=int, default=100000)
+    arg_parser.add_argument('--jobs', type=int, default=20)
+    arg_parser.add_argument('--k', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(0)
+    profiles = extract_profiles(load_corpus())
+    candidates = list(resample(profiles, args.candidates, rng))
+
+    # Job skills are drawn from the skills found in the corpus, so every job matches some candidates
+    corpus_skills = sorted({skill for profile in profiles for skill in profile['skills']})
+    jobs = [(rng.sample(corpus_skills, 8), rng.choice([1, 2, 5]), rng.choice(['Bachelor', 'Master'])) for _ in range(args.jobs)]
+
+    start = time.perf_counter()
+    ranker = CandidateRanker()
+    ranker.add_many(candidates)
+    ranker.rank(['python'])
+    build = time.perf_counter() - start
+
+    skill_sets = [(candidate_id, {utils.preprocess_skill(skill) for skill in details['skills']},
+                   details['experience'], get_degree_level(details['degree'])) for candidate_id, details in candidates]
+
+    start = time.perf_counter()
+    set_results = [set_rank(skill_sets, skills, min_years, degree, args.k) for skills, min_years, degree in jobs]
+    set_seconds = (time.perf_counter() - start) / len(jobs)
+
+    start = time.perf_counter()
+    ranker_results = [ranker.rank(skills, min_years, degree, k=args.k) for skills, min_years, degree in jobs]
+    ranker_seconds = (time.perf_counter() - start) / len(jobs)
+
+    # Same scores (float32 rounding aside), the candidates may only differ among equal scores
+    same = all(all(abs(x - y) < 1e-5 for (_, x), (_, y) in zip(a, b)) for a, b in zip(set_results, ranker_results))
+
+    print(f"{args.candidates} candidates, {args.jobs} jobs, top {args.k}")
+    print(f"ranker build (add_many + stacking): {build * 1000:.0f} ms")
+    print(f"set intersections: {set_seconds * 1000:8.1f} ms/job")
+    print(f"CandidateRanker:   {ranker_seconds * 1000:8.1f} ms/job ({set_seconds / ranker_seconds:.0f}x)")
+    print(f"same top-{args.k}: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+'''
+Regex microbenchmark: per-call compiled patterns vs the compiled registry
+
+Times the regex stages of a parse on every resume of Data/traindata.json,
+as they used to run (patterns built or looked up on every call, college
+searched line by line, one search per degree type) and as they run now.
+
+The degree outputs are not all the same: the previous patterns only had
+word boundaries around the whole alternation (so "Undergraduate" also
+matched "Graduate", a Master, and which words were anchored depended on
+the set order), the merged pattern matches whole words only. The resumes
+whose highest degree changed are listed.
+
+Contacts (email, mobile numbers and links) are also timed on link-heavy
+resumes and on resumes containing a long unbroken word, where the previous
+unguarded patterns backtracked from every character, and their outputs are
+checked against the previous ones.
+
+Usage:
+    python -m Benchmarks.regex [--repeat N]
+'''
+import re
+import time
+import argparse
+
+from Modules import constants as cs
+from Modules import extractors
+from Modules import utils
+from Benchmarks.skills import load_corpus
+
+
+def previous_highest_degree(text):
+    patterns = {}
+    for degree_type, words in cs.DEGREE.items():
+        patterns[degree_type] = re.compile(r'\b' + '|'.join(words) + r'\b', re.IGNORECASE)
+
+    for degree_type, name in cs.DEGREE_RANKS.items():
+        if re.search(patterns[degree_type], text):
+            return name
+    return 'Unknown'
+
+
+def previous_college(text):
+    colleges = set()
+    for line in text.split('\n'):
+        colleges.update(re.findall(cs.COLLEGE_PATTERN, line))
+    return list(colleges)
+
+
+PREVIOUS_URL_PATTERN = r'(?:http[s]?:\/\/.)?(?:www\.)?[-a-zA-Z0-9@%._\+~#=]{2,256}\.[a-z]{2,6}\b(?:[-a-zA-Z0-9@:%_\+.~#?&\/\/=]*)'
+PREVIOUS_EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+PREVIOUS_EXPERIENCE_PATTERN = r'(?P<fmonth>\w+. ?\d+)\s*(\D|to)\s*(?P<smonth>\w+. ?\d+|present)'
+
+
+def previous_contacts(text):
+    emails = re.findall(PREVIOUS_EMAIL_PATTERN, text)
+    numbers = re.findall(cs.PHONE_PATTERN, text)
+    links = re.findall(PREVIOUS_URL_PATTERN, text)
+
+    email = emails[0].split()[0].strip(';') if emails else None
+    mobile_numbers = list({number.replace(" ", "").replace("-", "").replace(".", "").replace(
+        "(", "").replace(")", "") for number in numbers if len(number) > 9}) if numbers else None
+    links = {link for link in links if utils.validate_link(link)}
+    return email, mobile_numbers, links
+
+
+def current_contacts(text):
+    return (extractors.extract_email(text), extractors.extract_mobile_numbers(text),
+            extractors.extract_links_from_text(text))
+
+
+def link_heavy(text, links=200):
+    return text + '\n' + '\n'.join(f"https://www.site{i}.com/profile/{i * 7919}?ref=cv{i} - "
+                                    f"contact{i}@mail{i}.org - +1 555 {i:03d} {i * 13 % 10000:04d}"
+                                    for i in range(links))
+
+
+def long_word(text, length=20000):
+    return 'x' * length + ' ' + text
+
+
+def previous_experience(lines):
+    return [re.search(PREVIOUS_EXPERIENCE_PATTERN, line, re.I) for line in lines]
+
+
+def current_experience(lines):
+    return [cs.EXPERIENCE_REGEX.search(line) for line in lines]
+
+
+def run(func, inputs, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in inputs:
+            func(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    texts = load_corpus()
+    lines = [text.split('\n') for text in texts]
+    heavy_texts = [link_heavy(text) for text in texts[:10]]
+    long_texts = [long_word(text) for text in texts[:10]]
+
+    for text in texts + heavy_texts + long_texts:
+        previous, current = previous_contacts(text), current_contacts(text)
+        assert previous[0] == current[0] and previous[2] == current[2], "Contacts differ from the previous patterns"
+        assert sorted(previous[1] or []) == sorted(current[1] or []), "Mobile numbers differ from the previous patterns"
+
+    changed = [(i, previous_highest_degree(text), extractors.extract_highest_degree(text)) for i, text in enumerate(texts)]
+    changed = [(i, before, after) for i, before, after in changed if before != after]
+    print(f"highest degree changed on {len(changed)}/{len(texts)} resumes (whole words only now)")
+    for i, before, after in changed:
+        print(f"    resume {i}: {before} -> {after}")
+    print()
+
+    stages = (
+        ('degree', previous_highest_degree, extractors.extract_highest_degree, texts),
+        ('college', previous_college, extractors.extract_college, texts),
+        ('contacts', previous_contacts, current_contacts, texts),
+        ('experience', previous_experience, current_experience, lines),
+    )
+    contact_stages = (
+        ('link-heavy', heavy_texts),
+        ('long word', long_texts),
+    )
+
+    print(f"resumes: {len(texts)}, best of {args.repeat} runs")
+    print(f"{'stage':<12}{'before (us/resume)':>20}{'after (us/resume)':>20}{'speedup':>10}")
+    total_before = total_after = 0
+    for name, previous, current, inputs in stages:
+        before, after = run(previous, inputs, args.repeat), run(current, inputs, args.repeat)
+        total_before, total_after = total_before + before, total_after + after
+        print(f"{name:<12}{before * 1e6 / len(texts):>20.1f}{after * 1e6 / len(texts):>20.1f}{before / after:>9.1f}x")
+    print(f"{'total':<12}{total_before * 1e6 / len(texts):>20.1f}{total_after * 1e6 / len(texts):>20.1f}"
+          f"{total_before / total_after:>9.1f}x")
+
+    print(f"\ncontacts on {len(heavy_texts)} modified resumes (same outputs)")
+    print(f"{'input':<12}{'before (us/resume)':>20}{'after (us/resume)':>20}{'speedup':>10}")
+    for name, inputs in contact_stages:
+        before, after = run(previous_contacts, inputs, args.repeat), run(current_contacts, inputs, args.repeat)
+        print(f"{name:<12}{before * 1e6 / len(inputs):>20.1f}{after * 1e6 / len(inputs):>20.1f}{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
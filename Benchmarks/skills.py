@@ -0,0 +1,142 @@
+'''
+Skill matching benchmark: regex brute-force scan vs `SkillIndex`
+
+The skills found in every resume of Data/traindata.json are scored against
+its labels: the items of its "Skills" spans (split on commas, parentheses,
+colons, bullets and line breaks) that skills.csv lists. The labels only
+cover the skills sections, so a real skill found elsewhere in the resume
+counts as a false positive: precision is a lower bound. Resumes without
+labelled skills are left out of the scores.
+
+The whole document is scanned with the raw index (every n-gram listed in
+skills.csv), with `extractors.find_skills` (the parser's fallback, which
+drops stopwords, short words, section headers and contact keywords) and
+with the regex paths. The skills section is scanned with
+`extractors.extract_skills` (whole items, as the parser does) and with
+the raw index.
+
+Usage:
+    python -m Benchmarks.skills [--repeat N]
+'''
+import re
+import json
+import time
+import argparse
+
+from Modules import constants as cs
+from Modules import extractors
+from Modules import utils
+from Modules.document import TextDocument
+from Modules.matchers import SkillIndex
+
+
+LABEL_ITEM_SEPARATORS = re.compile(r'[,;:()\n•|]|\s-\s|^\s*-|\s\*\s')
+
+
+def load_corpus(path= cs.workspace_dir + '/Data/traindata.json'):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line)['text'] for line in file if line.strip()]
+
+
+def load_labels(skill_set, path= cs.workspace_dir + '/Data/traindata.json'):
+    # Known skills of the labelled "Skills" spans of every resume (None without any)
+    labels = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            spans = [record['text'][start:end] for start, end, label in record['label'] if label == 'Skills']
+            items = {utils.preprocess_skill(item).strip('-*.') for span in spans
+                     for item in LABEL_ITEM_SEPARATORS.split(span)}
+            labels.append({item for item in items if item and item in skill_set} if spans else None)
+    return labels
+
+
+def load_skills(path= cs.workspace_dir + '/Data/skills.csv'):
+    return utils.load_csv_column(path, 'Skill')
+
+
+def regex_skills(text, skill_set):
+    # Regex brute-force scan: every `OBJECT_PATTERN` match is normalized and looked up
+    skills = re.findall(cs.OBJECT_PATTERN, text)
+    return {skill.capitalize() for skill in skills if utils.preprocess_skill(skill) in skill_set}
+
+
+def parser_regex_skills(text, skill_set):
+    # Brute-force fallback as `ResumeParser.parse` used to call it (one character per line)
+    return regex_skills('\n'.join(text), skill_set)
+
+
+def index_skills(text, skill_index):
+    return {skill.capitalize() for skill in skill_index.find(text)}
+
+
+def filtered_skills(text, skill_index):
+    return set(extractors.find_skills(text, skill_index))
+
+
+def section_items(text, skill_set):
+    return set(extractors.extract_skills(text, skill_set))
+
+
+def score(results, labels):
+    # Micro-averaged precision and recall over the labelled resumes
+    found = correct = expected = 0
+    for skills, label in zip(results, labels):
+        if label is None:
+            continue
+        skills = {utils.preprocess_skill(skill) for skill in skills}
+        found, correct, expected = found + len(skills), correct + len(skills & label), expected + len(label)
+    return correct / max(1, found), correct / max(1, expected)
+
+
+def run(func, texts, dictionary, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(text, dictionary) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    texts = load_corpus()
+    skill_set = load_skills()
+    skill_index = SkillIndex(skill_set)
+    labels = load_labels(skill_set)
+    sections = [TextDocument(utils.encode_text(text)).section_text('skills') or '' for text in texts]
+
+    scans = (
+        ('whole document', texts, (
+            ('parser regex', parser_regex_skills, skill_set),
+            ('regex', regex_skills, skill_set),
+            ('index', index_skills, skill_index),
+            ('find_skills', filtered_skills, skill_index),
+        )),
+        ('skills section', sections, (
+            ('items', section_items, skill_set),
+            ('index', index_skills, skill_index),
+        )),
+    )
+
+    labelled = [label for label in labels if label is not None]
+    print(f"resumes: {len(texts)} ({len(labelled)} with {sum(map(len, labelled))} labelled skills), "
+          f"skills in dictionary: {len(skill_set)}")
+    for scan, inputs, matchers in scans:
+        print(f"\n{scan}")
+        print(f"{'matcher':<14}{'total (ms)':>12}{'per resume (ms)':>18}{'skills found':>15}{'precision':>11}{'recall':>8}")
+        for name, func, dictionary in matchers:
+            seconds, results = run(func, inputs, dictionary, args.repeat)
+            found = sum(len(skills) for skills in results)
+            precision, recall = score(results, labels)
+            print(f"{name:<14}{seconds * 1000:>12.1f}{seconds * 1000 / len(texts):>18.3f}{found:>15}"
+                  f"{precision:>11.2f}{recall:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+'''
+Parser benchmark over the annotated resumes of Data/traindata.json
+
+Every resume is parsed as plain text and, optionally, as synthetic PDF
+and DOCX renderings of the same text. The report gives throughput,
+p50/p95/p99 latency, peak RSS, the time spent in every stage and the
+entity F1 of the extracted fields against the annotations.
+Stage timings come from the parser's profiling hooks.
+
+Usage:
+    python -m Benchmarks.suite [--formats text,pdf,docx] [--limit N] [--warmup N]
+                               [--fields email,mobile_numbers,links] [--tier full|fast]
+'''
+import io
+import re
+import json
+import time
+import resource
+import argparse
+import textwrap
+from collections import defaultdict
+
+from resume_analyzer import init_parser
+from Modules import constants as cs
+from Modules.metrics import ParseHook
+
+
+# Extracted field -> annotation label
+FIELD_LABELS = {
+    'name': 'Name',
+    'role': 'Designation',
+    'locations': 'Location',
+    'companies': 'Companies worked at',
+    'college': 'College',
+    'degree': 'Degree',
+    'skills': 'Skills',
+}
+
+LINES_PER_PAGE = 60
+LINE_WIDTH = 100
+
+
+def load_corpus(path= cs.workspace_dir + '/Data/traindata.json'):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def render_pdf(text: str, name: str) -> io.BytesIO:
+    import pymupdf
+
+    lines = [wrapped for line in text.split('\n') for wrapped in (textwrap.wrap(line, LINE_WIDTH) or [''])]
+    with pymupdf.open() as document:
+        for start in range(0, len(lines), LINES_PER_PAGE):
+            page = document.new_page()
+            page.insert_text((36, 48), '\n'.join(lines[start:start + LINES_PER_PAGE]), fontsize=9)
+        data = document.tobytes()
+
+    pdf_file = io.BytesIO(data)
+    pdf_file.name = name + '.pdf'
+    return pdf_file
+
+
+def render_docx(text: str, name: str) -> io.BytesIO:
+    from docx import Document
+
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+
+    docx_file = io.BytesIO()
+    document.save(docx_file)
+    docx_file.name = name + '.docx'
+    return docx_file
+
+
+def render(sample: dict, fmt: str):
+    if fmt == 'pdf':
+        return render_pdf(sample['text'], str(sample['id']))
+    if fmt == 'docx':
+        return render_docx(sample['text'], str(sample['id']))
+    return sample['text']
+
+
+def normalize(value: str) -> str:
+    return ' '.join(re.sub(r'[^\w+#]', ' ', value.lower()).split())
+
+
+def gold_entities(sample: dict) -> dict:
+    gold = defaultdict(set)
+    for start, end, label in sample['label']:
+        values = sample['text'][start:end]
+        # Skills are often annotated as whole comma separated lists
+        parts = re.split(r'[,\n]', values) if label == 'Skills' else [values]
+        gold[label].update(normalize(part) for part in parts if normalize(part))
+    return gold
+
+
+def predicted_entities(details: dict) -> dict:
+    predicted = defaultdict(set)
+    for field, label in FIELD_LABELS.items():
+        values = details.get(field) or []
+        if isinstance(values, str):
+            values = [values]
+        predicted[label].update(normalize(value) for value in values if normalize(value))
+    return predicted
+
+
+class StageTimings(ParseHook):
+    '''
+    Parse hook collecting the duration of every stage and the extraction paths
+    '''
+
+    def __init__(self):
+        self.stages = defaultdict(list)
+        self.paths = defaultdict(int)
+
+    def on_stage(self, stage, seconds):
+        self.stages[stage].append(seconds)
+
+    def on_path(self, field, path):
+        self.paths[(field, path)] += 1
+
+    def clear(self):
+        self.stages.clear()
+        self.paths.clear()
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def f1_scores(pairs: list) -> dict:
+    counts = defaultdict(lambda: [0, 0, 0])  # true positives, predicted, gold
+    for predicted, gold in pairs:
+        for label in FIELD_LABELS.values():
+            counts[label][0] += len(predicted[label] & gold[label])
+            counts[label][1] += len(predicted[label])
+            counts[label][2] += len(gold[label])
+
+    scores = {}
+    for label, (tp, n_pred, n_gold) in counts.items():
+        precision = tp / n_pred if n_pred else 0.0
+        recall = tp / n_gold if n_gold else 0.0
+        scores[label] = (precision, recall, 2 * precision * recall / (precision + recall) if tp else 0.0)
+
+    tp, n_pred, n_gold = (sum(count[i] for count in counts.values()) for i in range(3))
+    precision, recall = tp / n_pred if n_pred else 0.0, tp / n_gold if n_gold else 0.0
+    scores['micro'] = (precision, recall, 2 * precision * recall / (precision + recall) if tp else 0.0)
+    return scores
+
+
+def _rewind(resume):
+    if isinstance(resume, io.BytesIO):
+        resume.seek(0)
+    return resume
+
+
+def benchmark(parser, timings, samples: list, fmt: str, warmup: int, fields: list = None, tier: str = 'full'):
+    resumes = [render(sample, fmt) for sample in samples]
+    for resume in resumes[:warmup]:
+        parser.parse(_rewind(resume), fields, tier)
+    timings.clear()
+
+    latencies, pairs = [], []
+    start = time.perf_counter()
+    for sample, resume in zip(samples, resumes):
+        parse_start = time.perf_counter()
+        details = parser.parse(_rewind(resume), fields, tier)
+        latencies.append(time.perf_counter() - parse_start)
+        pairs.append((predicted_entities(details), gold_entities(sample)))
+    total = time.perf_counter() - start
+
+    return total, latencies, timings, f1_scores(pairs)
+
+
+def report(fmt, total, latencies, timings, scores):
+    ms = lambda seconds: seconds * 1000
+
+    print(f"\n== {fmt} ({len(latencies)} resumes) ==")
+    print(f"throughput: {len(latencies) / total:.2f} resumes/s")
+    print(f"latency (ms): p50 {ms(percentile(latencies, 50)):.1f}, p95 {ms(percentile(latencies, 95)):.1f}, "
+          f"p99 {ms(percentile(latencies, 99)):.1f}")
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    print(f"{'stage':<24}{'mean (ms)':>10}{'p95 (ms)':>10}{'share':>8}")
+    parse_total = sum(timings.stages['parse'])
+    for stage, values in timings.stages.items():
+        print(f"{stage:<24}{ms(sum(values) / len(values)):>10.2f}{ms(percentile(values, 95)):>10.2f}"
+              f"{sum(values) / parse_total:>8.1%}")
+
+    print(f"{'field':<24}{'path':<16}{'resumes':>8}")
+    for (field, path), count in sorted(timings.paths.items()):
+        print(f"{field:<24}{path:<16}{count:>8}")
+
+    print(f"{'entity':<24}{'precision':>10}{'recall':>10}{'f1':>8}")
+    for label, (precision, recall, f1) in scores.items():
+        print(f"{label:<24}{precision:>10.3f}{recall:>10.3f}{f1:>8.3f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--formats', default='text', help="comma separated list of text, pdf and docx")
+    arg_parser.add_argument('--limit', type=int, default=None, help="number of resumes used from the corpus")
+    arg_parser.add_argument('--warmup', type=int, default=3, help="number of untimed parses before measuring")
+    arg_parser.add_argument('--fields', default=None, help="comma separated list of the fields to extract (all by default)")
+    arg_parser.add_argument('--tier', default='full', choices=cs.TIERS, help="extraction tier")
+    args = arg_parser.parse_args()
+    fields = args.fields.split(',') if args.fields else None
+
+    samples = load_corpus()[:args.limit]
+    timings = StageTimings()
+    parser = init_parser(lazy=False, hooks=[timings])
+
+    for fmt in args.formats.split(','):
+        report(fmt, *benchmark(parser, timings, samples, fmt.strip(), args.warmup, fields, args.tier))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,17 @@
 import io
-import re
 
 import zipfile
 import pymupdf
 from datetime import datetime
-from dateutil import relativedelta
 from.extractors import handle_io_bytes
+from .document import ResumeDocument
+from . import constants as cs
 
 def get_number_of_pages(resume, ext):
-    if ext == 'pdf':
+    if isinstance(resume, ResumeDocument):
+        return resume.no_of_pages
+
+    elif ext == 'pdf':
         return get_number_of_pages_pdf(resume)
 
     elif ext == 'docx':
@@ -29,45 +32,117 @@ def get_number_of_pages_docx(docx_file: str | io.BytesIO) -> int:
     
     app_xml = ms_data.decode("utf-8")
 
-    regex = r"<(Pages)>(\d+)</(Pages)>"
-
-    matches = re.findall(regex, app_xml, re.MULTILINE)
+    matches = cs.DOCX_PAGES_REGEX.findall(app_xml)
     match = matches[0] if matches[0:] else [0, 0]
     page_count = match[1]
 
     return page_count
 
 
-def get_total_experience(experience_list):
+def get_total_experience(experience_list, merge_overlaps: bool = False, present: int = None):
     '''
     Wrapper function to extract total months of experience from a resume
 
     :param experience_list: list of experience text extracted
+    :param merge_overlaps: count the months of overlapping ranges (concurrent jobs) only once
+    :param present: month index used for "present" (see `get_month_index`), the current month by default
     :return: total months of experience
     '''
     assert isinstance(experience_list, list), "Input experience_list must be a list"
 
-    exp_ = []
-    for line in experience_list:
-        assert isinstance(line, str), "Each item in experience_list must be a string"
-        
-        experience = re.search(
-            r'(?P<fmonth>\w+. ?\d+)\s*(\D|to)\s*(?P<smonth>\w+. ?\d+|present)',
-            line,
-            re.I
-        )
-        if experience:
-            exp_.append(experience.groups())
-
-    total_exp = sum(
-        [abs(get_number_of_months_from_dates(i[0], i[2])) for i in exp_]
-    )
-    total_experience_in_months = total_exp
+    ranges = get_experience_ranges(experience_list, present)
+
+    if merge_overlaps:
+        total_experience_in_months = get_covered_months(ranges)
+    else:
+        total_experience_in_months = sum(end - start for start, end in ranges)
 
     assert isinstance(total_experience_in_months, int), "Output total_experience_in_months must be an integer"
     return total_experience_in_months
 
 
+def get_experience_ranges(experience_list, present: int = None):
+    '''
+    Helper function to extract the date ranges of the experience lines (one range per line at most)
+
+    :param experience_list: list of experience text extracted
+    :param present: month index used for "present", the current month by default
+    :return: list of (start, end) month indexes, start <= end; unreadable ranges are left out
+    '''
+    ranges = []
+    for line in experience_list:
+        assert isinstance(line, str), "Each item in experience_list must be a string"
+
+        experience = cs.EXPERIENCE_REGEX.search(line)
+        if not experience:
+            continue
+
+        if present is None and experience.group('smonth').lower() == 'present':
+            present = get_current_month_index()
+
+        start = get_month_index(experience.group('fmonth'))
+        end = get_month_index(experience.group('smonth'), present)
+        if start is not None and end is not None:
+            ranges.append((min(start, end), max(start, end)))
+
+    return ranges
+
+
+def get_covered_months(ranges):
+    '''
+    Helper function to count the months covered by date ranges, overlapping ranges counted once
+
+    :param ranges: list of (start, end) month indexes
+    :return: number of months covered
+    '''
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(ranges):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+
+    if current_end is not None:
+        total += current_end - current_start
+
+    return total
+
+
+def get_current_month_index() -> int:
+    '''
+    Helper function to get the month index of the current month
+    '''
+    today = datetime.now()
+    return today.year * 12 + today.month - 1
+
+
+def get_month_index(date: str, present: int = None):
+    '''
+    Helper function to convert a "Mon YYYY" date ("Month YYYY" also accepted) to a number of months
+
+    :param date: date as written in the resume, or "present"
+    :param present: month index returned for "present", the current month by default
+    :return: year * 12 + month - 1, or None when the date cannot be read
+    '''
+    if date.lower() == 'present':
+        return present if present is not None else get_current_month_index()
+
+    # Same dates as `strptime(date, '%b %Y')` once long month names are cut to 3 letters
+    date = date.split()
+    if len(date) < 2 or (len(date) > 2 and len(date[0]) <= 3):
+        return None
+
+    month = cs.MONTH_NUMBERS.get(date[0][:3].lower())
+    year = date[1]
+    if month is None or len(year) != 4 or not year.isdecimal() or int(year) == 0:
+        return None
+
+    return int(year) * 12 + month - 1
+
+
 def get_number_of_months_from_dates(date1, date2):
     '''
     Helper function to extract total months of experience from a resume
@@ -76,23 +151,9 @@ def get_number_of_months_from_dates(date1, date2):
     :param date2: Ending date
     :return: months of experience from date1 to date2
     '''
-    if date2.lower() == 'present':
-        date2 = datetime.now().strftime('%b %Y')
-    try:
-        if len(date1.split()[0]) > 3:
-            date1 = date1.split()
-            date1 = date1[0][:3] + ' ' + date1[1]
-        if len(date2.split()[0]) > 3:
-            date2 = date2.split()
-            date2 = date2[0][:3] + ' ' + date2[1]
-    except IndexError:
+    start = get_month_index(date1) if date1.lower() != 'present' else None
+    end = get_month_index(date2)
+    if start is None or end is None:
         return 0
-    try:
-        date1 = datetime.strptime(str(date1), '%b %Y')
-        date2 = datetime.strptime(str(date2), '%b %Y')
-        months_of_experience = relativedelta.relativedelta(date2, date1)
-        months_of_experience = (months_of_experience.years
-                                * 12 + months_of_experience.months)
-    except ValueError:
-        return 0
-    return months_of_experience
\ No newline at end of file
+
+    return end - start
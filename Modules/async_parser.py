@@ -0,0 +1,145 @@
+import io
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .parser import ResumeParser
+
+
+class AsyncResumeParser(object):
+    '''
+    asyncio front-end of a `ResumeParser`.
+
+    Every stage runs outside the event loop: files are read in an I/O
+    executor, text extraction and the regex/dictionary stages in a CPU
+    executor, and the NER calls of concurrent parses are gathered by a
+    micro-batching queue (up to `max_batch_size` texts, waiting at most
+    `max_latency` seconds) before being sent to the model as one batch.
+    At most `max_concurrency` resumes are in flight at once, which bounds
+    both the CPU work and the number of documents held in memory.
+    '''
+
+    def __init__(self,
+                 parser: ResumeParser = None,
+                 max_concurrency: int = 8,
+                 max_batch_size: int = 8,
+                 max_latency: float = 0.01,
+                 cpu_workers: int = None):
+
+        if max_concurrency < 1 or max_batch_size < 1:
+            raise ValueError("max_concurrency and max_batch_size must be positive integers")
+
+        self.__parser = parser if parser is not None else ResumeParser()
+        self.__max_batch_size = max_batch_size
+        self.__max_latency = max_latency
+
+        self.__io_executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='resume-io')
+        self.__cpu_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix='resume-cpu')
+        self.__ner_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-ner')
+
+        self.__max_concurrency = max_concurrency
+        self.__semaphore = None
+        self.__queue = None
+        self.__batcher = None
+
+    def __start(self):
+        # asyncio primitives are created lazily, inside the running event loop
+        if self.__batcher is None:
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+            self.__queue = asyncio.Queue()
+            self.__batcher = asyncio.get_running_loop().create_task(self.__batch_ner())
+
+    async def parse(self, resume):
+        '''
+        Parses the given resume (file path, file-like object or text) without blocking the event loop
+
+        :return: dictionary of the extracted resume details (see `ResumeParser.parse`)
+        '''
+        self.__start()
+        loop = asyncio.get_running_loop()
+
+        async with self.__semaphore:
+            if isinstance(resume, str) and resume.lower().endswith(('.pdf', '.docx')):
+                resume = await loop.run_in_executor(self.__io_executor, self.__read_file, resume)
+
+            resume, key, details = await loop.run_in_executor(self.__cpu_executor, self.__parser._lookup, resume)
+            if details is not None:
+                return details
+
+            resume, ext, text = await loop.run_in_executor(self.__cpu_executor, self.__parser._load, resume)
+
+            future = loop.create_future()
+            await self.__queue.put((text, future))
+            pretrained_output = await future
+
+            details = await loop.run_in_executor(self.__cpu_executor, self.__parser._analyze,
+                                                 resume, ext, text, pretrained_output)
+            await loop.run_in_executor(self.__io_executor, self.__parser._store, key, details)
+
+            return details
+
+    async def parse_many(self, resumes) -> list[dict]:
+        '''
+        Parses the given resumes concurrently (within the concurrency bound)
+
+        :return: list of the extracted details, in the input order
+        '''
+        return await asyncio.gather(*(self.parse(resume) for resume in resumes))
+
+    @staticmethod
+    def __read_file(path: str) -> io.BytesIO:
+        with open(path, 'rb') as file:
+            memory_file = io.BytesIO(file.read())
+            memory_file.name = os.path.basename(path)
+
+        return memory_file
+
+    async def __batch_ner(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.__queue.get()]
+
+            # Wait for more texts until the batch is full or the latency window is over
+            deadline = loop.time() + self.__max_latency
+            while len(batch) < self.__max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                outputs = await loop.run_in_executor(self.__ner_executor, self.__parser._run_ner, texts, len(texts))
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                for (_, future), output in zip(batch, outputs):
+                    if not future.done():
+                        future.set_result(output)
+
+    async def close(self):
+        '''
+        Stops the NER batching task and the executors
+        '''
+        if self.__batcher is not None:
+            self.__batcher.cancel()
+            try:
+                await self.__batcher
+            except asyncio.CancelledError:
+                pass
+            self.__batcher = None
+
+        for executor in (self.__io_executor, self.__cpu_executor, self.__ner_executor):
+            executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
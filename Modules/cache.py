@@ -0,0 +1,132 @@
+import copy
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def hash_bytes(*chunks) -> str:
+    '''
+    Helper function to hash byte strings (or strings) into one hex digest
+    '''
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        digest.update(len(chunk).to_bytes(8, 'little'))
+        digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_file(path: str) -> str:
+    '''
+    Helper function to hash the content of a file
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    '''
+    Cache of extracted resume details, keyed on the hash of the resume
+    bytes and of the parser configuration.
+
+    The most recently used results are kept in memory (LRU eviction after
+    `max_size` entries). When `path` is given, every result is also
+    written to a SQLite database, so it survives restarts and can be
+    shared by several processes.
+    '''
+
+    def __init__(self, max_size: int = 1024, path: str = None):
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        self.__max_size = max_size
+        self.__memory = OrderedDict()
+        self.__lock = threading.Lock()
+
+        self.__path = path
+        self.__db = None
+        if path:
+            self.__db = sqlite3.connect(path, check_same_thread=False)
+            self.__db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, details TEXT NOT NULL)")
+            self.__db.commit()
+
+    def __len__(self):
+        return len(self.__memory)
+
+    def get(self, key: str):
+        '''
+        Returns a copy of the cached details of `key`, or None
+        '''
+        with self.__lock:
+            if key in self.__memory:
+                self.__memory.move_to_end(key)
+                return copy.deepcopy(self.__memory[key])
+
+            if self.__db is None:
+                return None
+
+            row = self.__db.execute("SELECT details FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            details = json.loads(row[0])
+            self.__remember(key, details)
+
+        return copy.deepcopy(details)
+
+    def set(self, key: str, details: dict):
+        '''
+        Caches a copy of `details` under `key`
+        '''
+        details = copy.deepcopy(details)
+
+        with self.__lock:
+            self.__remember(key, details)
+
+            if self.__db is not None:
+                self.__db.execute("INSERT OR REPLACE INTO results (key, details) VALUES (?, ?)", (key, json.dumps(details)))
+                self.__db.commit()
+
+    def __remember(self, key: str, details: dict):
+        self.__memory[key] = details
+        self.__memory.move_to_end(key)
+
+        while len(self.__memory) > self.__max_size:
+            self.__memory.popitem(last=False)
+
+    def clear(self):
+        '''
+        Removes every cached result (from memory and from the database)
+        '''
+        with self.__lock:
+            self.__memory.clear()
+
+            if self.__db is not None:
+                self.__db.execute("DELETE FROM results")
+                self.__db.commit()
+
+    def reopen(self):
+        '''
+        Opens a new connection to the database, if any, without closing the inherited one
+        (a forked process must not use the SQLite connection of its parent)
+        '''
+        self.__lock = threading.Lock()
+        if self.__db is not None:
+            self.__db = sqlite3.connect(self.__path, check_same_thread=False)
+
+    def close(self):
+        '''
+        Closes the database, if any
+        '''
+        with self.__lock:
+            if self.__db is not None:
+                self.__db.close()
+                self.__db = None
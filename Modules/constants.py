@@ -1,22 +1,112 @@
 import os
+import re
 
 workspace_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# NER model (token classification)
+NER_MODEL = "reyhanemyr/bert-base-NER-finetuned-cv"
+
+# NER inference backends: fp32 PyTorch, PyTorch with dynamic int8 quantization, ONNX Runtime
+NER_BACKENDS = ('torch', 'torch-int8', 'onnx')
+NER_BACKEND = 'torch'
+
+# NER sliding window (in tokens, the model accepts up to 512 including special tokens)
+NER_WINDOW = 384
+NER_OVERLAP = 64
+
+# Fields of the extracted details
+FIELDS = ('name', 'email', 'mobile_numbers', 'role', 'locations', 'skills', 'college', 'degree',
+          'companies', 'experience', 'links', 'no_of_pages', 'format')
+# Fields only the NER model can fill
+NER_FIELDS = ('name', 'role', 'locations')
+# Fields taken from the NER model when it runs, from dictionaries and regexes otherwise
+FALLBACK_FIELDS = ('skills', 'degree', 'companies', 'college')
+# Extraction tiers: `full` always runs the NER model, `fast` only when the requested fields need it
+TIERS = ('full', 'fast')
+
+# Weights of the ranking criteria (see `ranking.CandidateRanker`)
+RANKING_WEIGHTS = {'skills': 0.6, 'experience': 0.2, 'degree': 0.1, 'companies': 0.1}
+
+# Near-duplicate detection: MinHash signatures of word shingles, split into LSH bands.
+# Two texts share a band with probability ~s^(perm/bands) for a Jaccard similarity s,
+# the candidates are then kept above the threshold (estimated from the signatures).
+DEDUP_SHINGLE = 3
+DEDUP_NUM_PERM = 128
+DEDUP_BANDS = 16
+DEDUP_THRESHOLD = 0.9
+# Entities of a near-duplicate that must appear in the new text for its NER output to be reused
+DEDUP_CHECKED_ENTITIES = ('PER',)
+
+# Parser daemon: maximum number of pipelined resumes of a connection parsed at once (see `daemon.ParserDaemon`)
+DAEMON_BATCH_SIZE = 8
+
+# PDFs of at least this many pages are decoded by a pool of page workers (when the parser has some)
+PDF_PARALLEL_PAGES = 16
+
+# Garbage collection (full collection every N parses, or above an RSS watermark in bytes)
+GC_COLLECT_EVERY = 1000
+GC_RSS_WATERMARK = None
+GC_WATERMARK_INTERVAL = 50
+
 # Patterns
 NAME_PATTERN = r'[A-Z][a-z]+'
 NOT_ALPHA_NUMERIC = r'[^a-zA-Z\d]'
 OBJECT_PATTERN = r"\b\w+(?:[- ]\w+)*\b"
 NUMBER = r'\d+'
 PHONE_PATTERN = r'\(?\+?\d{1,3}\)?[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}'
-URL_PATTERN = r'(?:http[s]?:\/\/.)?(?:www\.)?[-a-zA-Z0-9@%._\+~#=]{2,256}\.[a-z]{2,6}\b(?:[-a-zA-Z0-9@:%_\+.~#?&\/\/=]*)'
-EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+# Links and emails only start where the previous character cannot be part of them: a match
+# starting inside a word implies one starting at the start of that word, so the results are
+# the same, but a long word is no longer rescanned (and backtracked) from each of its characters.
+URL_CHARS = r'[-a-zA-Z0-9@%._\+~#=]'
+EMAIL_CHARS = r'[a-zA-Z0-9._%+-]'
+URL_PATTERN = r'(?:http[s]?:\/\/.|(?<!' + URL_CHARS + r'))(?:www\.)?' + URL_CHARS + r'{2,256}\.[a-z]{2,6}\b(?:[-a-zA-Z0-9@:%_\+.~#?&\/\/=]*)'
+EMAIL_PATTERN = r'(?<!' + EMAIL_CHARS + ')' + EMAIL_CHARS + r'+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
 SKILL_PATTERN = r"[Cc](?:\+\+|\#)?|" + OBJECT_PATTERN
+SKILL_TOKEN_PATTERN = r'([^\S\n]*)(\w+|[^\w\s]|\n)'
+WORD_BOUNDARY_PATTERN = r'\b'
+
+# Longest skill searched by the skill index (in word/punctuation tokens)
+SKILL_MAX_TOKENS = 8
+# Skill prefixes up to this length are kept in a set by the skill index
+SKILL_PREFIX_LENGTH = 8
+
+# Whole-document skill scan: single words this short or in this list are not taken for skills
+# (skills.csv lists words such as "It", "Be" or "Less", which every resume contains)
+SKILL_MIN_WORD_LENGTH = 3
+SKILL_STOPWORDS = {
+    'a', 'about', 'above', 'after', 'again', 'against', 'all', 'also', 'am', 'an', 'and', 'any', 'are', 'as',
+    'at', 'be', 'because', 'been', 'before', 'being', 'below', 'between', 'both', 'but', 'by', 'can', 'could',
+    'did', 'do', 'does', 'doing', 'down', 'during', 'each', 'etc', 'few', 'for', 'from', 'further', 'good',
+    'had', 'has', 'have', 'having', 'he', 'her', 'here', 'hers', 'him', 'his', 'how', 'i', 'if', 'in', 'into',
+    'is', 'it', 'its', 'just', 'less', 'may', 'me', 'more', 'most', 'much', 'my', 'new', 'no', 'nor', 'not',
+    'now', 'of', 'off', 'on', 'once', 'one', 'only', 'or', 'other', 'our', 'out', 'over', 'own', 'same', 'she',
+    'should', 'so', 'some', 'such', 'than', 'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they',
+    'this', 'those', 'through', 'to', 'too', 'under', 'until', 'up', 'us', 'use', 'used', 'very', 'was', 'we',
+    'well', 'were', 'what', 'when', 'where', 'which', 'while', 'who', 'whom', 'why', 'will', 'with', 'within',
+    'would', 'year', 'years', 'you', 'your',
+}
+# Section headers and contact keywords are never skills, whatever their number of words (no-space form)
+SKILL_EXCLUDED = {section.replace(' ', '') for section in (
+    'accomplishments', 'experience', 'work experience', 'professional experience', 'volunteering', 'activities',
+    'education', 'interests', 'projects', 'publications', 'skills', 'technical skills', 'certifications',
+    'certificates', 'objective', 'career objective', 'summary', 'leadership', 'additional information',
+    'personal details', 'languages', 'references',
+)} | {
+    'email', 'e-mail', 'mail', 'http', 'https', 'www', 'com', 'indeed', 'linkedin', 'github', 'phone', 'mobile',
+    'contact', 'address', 'resume', 'cv',
+}
+
+# Compact dictionaries (marisa-trie) built from the CSV files, saved next to them with this extension
+DICTIONARY_EXTENSION = '.marisa'
 
 # Scholar Keywords
 SCHOLAR_KEYWORDS = r'[Uu]niversity|[Cc]ollege|[Ii]nstitute'
 OBJECT_MULTIPLE_NAME_PATTERN = f"(?:{NAME_PATTERN} )+"
 COLLEGE_PATTERN = r'\b(?:' + f"(?:{SCHOLAR_KEYWORDS})" + r' of (?:[Tt]he )?' + f"(?:{OBJECT_MULTIPLE_NAME_PATTERN})?" + NAME_PATTERN + ')|(?:' + OBJECT_MULTIPLE_NAME_PATTERN + SCHOLAR_KEYWORDS + r')\b'
 
+# Experience date ranges (e.g. "Nov 2017 to Present"), only searched from the start of words
+EXPERIENCE_PATTERN = r'(?<!\w)(?P<fmonth>\w+. ?\d+)\s*(\D|to)\s*(?P<smonth>\w+. ?\d+|present)'
+
 # Education (Upper Case Mandatory)
 EDUCATION = {
             'BE', 'B.E.', 'B.E', 'BS', 'B.S',  # Bachelor of Engineering, Bachelor of Science
@@ -45,6 +135,25 @@ DEGREE = {
     },
 }
 
+# Degree types from the highest to the lowest, with their display names
+DEGREE_RANKS = {
+    'phd': 'PhD',
+    'master': 'Master',
+    'bachelor': 'Bachelor',
+    'diploma': 'Diploma',
+    'high_school': 'High School',
+}
+
+# One alternation with a named group per degree type (plurals and possessives included).
+# Every word matches as a whole word only, e.g. "Undergraduate" is not taken for "Graduate".
+# The leading lookahead on the first letters lets the regex engine skip most positions quickly.
+DEGREE_PATTERN = (
+    "(?=[" + ''.join(sorted({word[0].lower() for words in DEGREE.values() for word in words})) + r"])\b(?:"
+    + '|'.join(f"(?P<{degree_type}>" + '|'.join(sorted(DEGREE[degree_type], key=lambda word: (-len(word), word))) + ")"
+               for degree_type in DEGREE_RANKS)
+    + r")(?:'?s)?\b"
+)
+
 
 # For finding date ranges
 MONTHS_SHORT = r'''(jan)|(feb)|(mar)|(apr)|(may)|(jun)|(jul)|(aug)|(sep)|(oct)|(nov)|(dec)'''
@@ -52,6 +161,10 @@ MONTHS_LONG = r'''(january)|(february)|(march)|(april)|(may)|(june)|(july)|(augu
 MONTH = r'(' + MONTHS_SHORT + r'|' + MONTHS_LONG + r')'
 YEAR = r'(((20|19)(\d{2})))'
 
+# Month numbers by abbreviation, for the experience date ranges (month names are cut to 3 letters)
+MONTH_NUMBERS = {month: number for number, month in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+
 RESUME_SECTIONS = [
                     'accomplishments',
                     'experience',
@@ -69,4 +182,30 @@ RESUME_SECTIONS = [
                     'career objective',
                     'summary',
                     'leadership',
-                ]
\ No newline at end of file
+                ]
+
+# Section header candidates in the lower-cased text: a section name between whitespace
+# (the header rule is then checked on the line)
+SECTION_HEADER_PATTERN = r'(?<!\S)(?:' + '|'.join(RESUME_SECTIONS) + r')(?!\S)'
+LINE_BREAK_PATTERN = r'\n'
+WORD_PATTERN = r'\w+'
+
+
+#---------------------------#
+# Compiled patterns registry #
+#---------------------------#
+# Compiled once at import, the extractors never compile a pattern per call.
+EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+PHONE_REGEX = re.compile(PHONE_PATTERN)
+URL_REGEX = re.compile(URL_PATTERN)
+OBJECT_REGEX = re.compile(OBJECT_PATTERN)
+SKILL_REGEX = re.compile(SKILL_PATTERN)
+SKILL_TOKEN_REGEX = re.compile(SKILL_TOKEN_PATTERN)
+WORD_BOUNDARY_REGEX = re.compile(WORD_BOUNDARY_PATTERN)
+COLLEGE_REGEX = re.compile(COLLEGE_PATTERN)
+DEGREE_REGEX = re.compile(DEGREE_PATTERN, re.IGNORECASE)
+EXPERIENCE_REGEX = re.compile(EXPERIENCE_PATTERN, re.IGNORECASE)
+SECTION_HEADER_REGEX = re.compile(SECTION_HEADER_PATTERN)
+LINE_BREAK_REGEX = re.compile(LINE_BREAK_PATTERN)
+WORD_REGEX = re.compile(WORD_PATTERN)
+DOCX_PAGES_REGEX = re.compile(r"<(Pages)>(\d+)</(Pages)>", re.MULTILINE)
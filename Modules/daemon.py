@@ -0,0 +1,561 @@
+'''
+Resident parser daemon
+
+Loading the NER model and the dictionaries takes seconds, which every
+short-lived script calling `init_parser` pays again. The daemon loads a
+`ResumeParser` once and parses the resumes sent over a local Unix socket
+(or over its stdin/stdout), so cron jobs and shell tools get the latency
+of a warm parser.
+
+Protocol: one JSON object per line in both directions. A request holds a
+resume as `path` (read by the daemon), `data` (base64 bytes, with the
+file `name` for its extension) or `text`, with optional `fields` and
+`tier` (see `ResumeParser.parse`), and an `id` copied to its response:
+    {"id": 1, "path": "/data/resume.pdf", "fields": ["name", "email"]}
+    {"id": 1, "result": {"name": ..., "email": ...}}
+    {"id": 2, "error": "FileNotFoundError: ..."}
+Requests can be pipelined: the responses of a connection come in the
+request order, and the requests already received are parsed together
+(NER batches of up to `batch_size` resumes). `{"op": "ping"}` and
+`{"op": "shutdown"}` check and stop the daemon.
+
+Usage (from the repository root):
+    python -m Modules.daemon serve [--socket PATH | --stdio] [--model-dir DIR] [--cache results.sqlite]
+    python -m Modules.daemon parse [--socket PATH] [--fields name,email] [--tier fast] [--send-bytes] FILE... (- for a text on stdin)
+    python -m Modules.daemon ping|stop [--socket PATH]
+'''
+import io
+import os
+import sys
+import json
+import queue
+import base64
+import socket
+import argparse
+import threading
+import socketserver
+
+from . import constants as cs
+
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+_END = object()
+
+
+def get_default_socket() -> str:
+    '''
+    Helper function to get the default socket path of the current user's daemon
+    (computed on use: `os.getuid` does not exist on every platform)
+    '''
+    return os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp', f'resume-analyzer-{os.getuid()}.sock')
+
+
+def _read_resume(request: dict):
+    # Returns the resume of a parse request (None for the other operations)
+    if not isinstance(request, dict):
+        raise ValueError("Invalid request: not a JSON object")
+
+    op = request.get('op', 'parse')
+    if op != 'parse':
+        if op not in ('ping', 'shutdown'):
+            raise ValueError(f"Unsupported operation: {op}")
+        return None
+
+    if 'path' in request:
+        # Any other path would be taken for a text by the parser
+        if not request['path'].lower().endswith(RESUME_EXTENSIONS):
+            raise ValueError(f"Unsupported file extension: {request['path']}")
+        return request['path']
+    if 'data' in request:
+        resume = io.BytesIO(base64.b64decode(request['data']))
+        resume.name = request.get('name', '')
+        if not resume.name.lower().endswith(RESUME_EXTENSIONS):
+            raise ValueError(f"Unsupported file extension: {resume.name}")
+        return resume
+    if 'text' in request:
+        return request['text']
+
+    raise ValueError("Invalid request: no path, data or text")
+
+
+def _read_options(request: dict) -> tuple:
+    # Returns the (fields, tier) of a parse request, which also groups the requests
+    fields = request.get('fields') or None
+    if fields is not None:
+        if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+            raise ValueError(f"Invalid fields: {fields} (expected a list of field names)")
+        fields = tuple(fields)
+
+    tier = request.get('tier', 'full')
+    if not isinstance(tier, str):
+        raise ValueError(f"Invalid tier: {tier} (expected a tier name)")
+    return fields, tier
+
+
+def _parse_group(parser, group: list, fields, tier):
+    # Parses the resumes of a group of requests together, one by one if one of them fails
+    try:
+        return [{'result': details} for details in parser.parse_many([resume for _, resume in group], len(group), fields, tier)]
+    except Exception:
+        responses = []
+        for _, resume in group:
+            try:
+                responses.append({'result': parser.parse(resume, fields, tier)})
+            except Exception as error:
+                responses.append({'error': f"{type(error).__name__}: {error}"})
+        return responses
+
+
+def _handle_batch(parser, lines: list) -> tuple[list, bool]:
+    # Returns the responses of a batch of request lines, in order, and whether the daemon must stop
+    responses = [None] * len(lines)
+    groups = {}
+    stop = False
+
+    for i, line in enumerate(lines):
+        request = None
+        try:
+            request = json.loads(line)
+            resume = _read_resume(request)
+            options = _read_options(request) if resume is not None else None
+        except Exception as error:
+            request_id = request.get('id') if isinstance(request, dict) else None
+            responses[i] = {'id': request_id, 'error': f"{type(error).__name__}: {error}"}
+            continue
+
+        if resume is None:
+            responses[i] = {'id': request.get('id'), 'result': 'pong' if request['op'] == 'ping' else 'stopping'}
+            stop = stop or request['op'] == 'shutdown'
+            continue
+
+        # Requests with the same fields and tier go through the model together
+        groups.setdefault(options, []).append((i, resume))
+        responses[i] = {'id': request.get('id')}
+
+    for (fields, tier), group in groups.items():
+        for (i, _), response in zip(group, _parse_group(parser, group, fields, tier)):
+            responses[i].update(response)
+
+    return responses, stop
+
+
+def serve_stream(parser, rfile, wfile, batch_size: int = cs.DAEMON_BATCH_SIZE) -> bool:
+    '''
+    Answers the requests read from a binary stream until its end (or a shutdown request)
+
+    A background thread reads the next requests while the current ones are
+    parsed: every request already received (up to `batch_size`) is parsed in
+    the same NER batch, and the responses are written in the request order.
+
+    :param parser: `ResumeParser` to be used
+    :param rfile: binary stream of the requests (JSON lines)
+    :param wfile: binary stream the responses are written to (JSON lines)
+    :param batch_size: maximum number of resumes parsed at once
+    :return: whether a shutdown was requested
+    '''
+    received = queue.Queue(maxsize=4 * batch_size)
+
+    def read():
+        try:
+            for line in rfile:
+                if line.strip():
+                    received.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            received.put(_END)
+
+    reader = threading.Thread(target=read, name='daemon-reader', daemon=True)
+    reader.start()
+
+    finished = False
+    while not finished:
+        # Wait for one request, then take the ones already received (up to `batch_size`)
+        batch = [received.get()]
+        while len(batch) < batch_size and batch[-1] is not _END:
+            try:
+                batch.append(received.get_nowait())
+            except queue.Empty:
+                break
+
+        if batch[-1] is _END:
+            batch.pop()
+            finished = True
+
+        responses, stop = _handle_batch(parser, batch)
+        try:
+            for response in responses:
+                wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
+        if stop:
+            return True
+
+    return False
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        if serve_stream(self.server.parser, self.rfile, self.wfile, self.server.batch_size):
+            # `shutdown` waits for `serve_forever`, which runs in another thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ParserDaemon(object):
+    '''
+    Unix socket server sharing one warm `ResumeParser` between its clients.
+
+    The parser (NER model, skill and company dictionaries) is loaded before
+    the socket is opened. Every connection is served by its own thread (see
+    `serve_stream`); the NER calls of different connections are serialized
+    by the parser. The socket file is only accessible to the current user,
+    as the daemon reads the files the requests point to.
+    '''
+
+    def __init__(self, path: str = None, parser=None, batch_size: int = cs.DAEMON_BATCH_SIZE, **parser_kwargs):
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        # The parser is only imported by the daemon, the clients stay light to start
+        from .parser import ResumeParser
+
+        parser = parser if parser is not None else ResumeParser(**parser_kwargs)
+        parser.warmup()
+
+        path = path if path is not None else get_default_socket()
+        self.path = path
+        self.__remove_stale_socket(path)
+
+        umask = os.umask(0o177)
+        try:
+            self.__server = _DaemonServer(path, _DaemonHandler)
+        finally:
+            os.umask(umask)
+
+        self.__server.parser = parser
+        self.__server.batch_size = batch_size
+
+    @staticmethod
+    def __remove_stale_socket(path: str):
+        # The socket file of a daemon that did not stop cleanly is removed, a running daemon is kept
+        if not os.path.exists(path):
+            return
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+        else:
+            raise ValueError(f"A daemon is already listening on {path}")
+        finally:
+            probe.close()
+
+    def serve_forever(self):
+        '''
+        Serves the requests until `shutdown` (or a shutdown request), then closes the socket
+        '''
+        try:
+            self.__server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        '''
+        Stops `serve_forever` (to be called from another thread)
+        '''
+        self.__server.shutdown()
+
+    def close(self):
+        '''
+        Closes the socket and removes its file
+        '''
+        self.__server.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def serve_stdio(parser=None, batch_size: int = cs.DAEMON_BATCH_SIZE, **parser_kwargs):
+    '''
+    Answers the requests read from stdin on stdout (e.g. for a parent process holding the pipes)
+
+    Anything else printed while parsing goes to stderr, so stdout only carries the responses.
+    '''
+    from .parser import ResumeParser
+
+    parser = parser if parser is not None else ResumeParser(**parser_kwargs)
+    parser.warmup()
+
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        serve_stream(parser, sys.stdin.buffer, stdout.buffer, batch_size)
+    finally:
+        sys.stdout = stdout
+
+
+class DaemonClient(object):
+    '''
+    Client of a `ParserDaemon`, over one connection.
+
+    Resume file paths are sent as absolute paths for the daemon to read
+    them (or as bytes with `send_bytes`), in-memory files as bytes and other
+    strings as texts. The requests are pipelined: they are written by a
+    background thread while the responses are read (see `responses`). A client must not be
+    shared between threads.
+    '''
+
+    def __init__(self, path: str = None, timeout: float = None, send_bytes: bool = False):
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.settimeout(timeout)
+        try:
+            self.__socket.connect(path if path is not None else get_default_socket())
+        except OSError:
+            self.__socket.close()
+            raise
+
+        self.__rfile = self.__socket.makefile('rb')
+        self.__wfile = self.__socket.makefile('wb')
+        self.__send_bytes = send_bytes
+        self.__next_id = 0
+
+    def __encode(self, resume, fields, tier) -> dict:
+        self.__next_id += 1
+        request = {'id': self.__next_id}
+
+        if isinstance(resume, io.BytesIO):
+            request['data'] = base64.b64encode(resume.getvalue()).decode('ascii')
+            request['name'] = resume.name
+        elif isinstance(resume, str) and resume.lower().endswith(RESUME_EXTENSIONS):
+            if self.__send_bytes:
+                with open(resume, 'rb') as resume_file:
+                    request['data'] = base64.b64encode(resume_file.read()).decode('ascii')
+                request['name'] = os.path.basename(resume)
+            else:
+                request['path'] = os.path.abspath(resume)
+        elif isinstance(resume, str):
+            request['text'] = resume
+        else:
+            raise ValueError("Invalid resume data")
+
+        if fields is not None:
+            request['fields'] = list(fields)
+        if tier != 'full':
+            request['tier'] = tier
+
+        return request
+
+    def __send(self, request: dict):
+        self.__wfile.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.__wfile.flush()
+
+    def __receive(self) -> dict:
+        line = self.__rfile.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+        return json.loads(line)
+
+    def request(self, op: str):
+        '''
+        Sends an operation (`ping` or `shutdown`) and returns its result
+        '''
+        self.__next_id += 1
+        self.__send({'id': self.__next_id, 'op': op})
+        response = self.__receive()
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['result']
+
+    def ping(self) -> bool:
+        '''
+        Tells whether the daemon answers
+        '''
+        return self.request('ping') == 'pong'
+
+    def shutdown(self):
+        '''
+        Stops the daemon once the requests it already received are answered
+        '''
+        self.request('shutdown')
+
+    def responses(self, resumes, fields=None, tier='full'):
+        '''
+        Sends the given resumes to the daemon, the requests being pipelined
+
+        :param resumes: iterable of resume file paths, in-memory files or texts
+        :param fields: fields to extract, all of them by default (see `ResumeParser.parse`)
+        :param tier: extraction tier, `full` or `fast` (see `ResumeParser.parse`)
+        :return: iterator over the responses (`{"id": ..., "result": ...}` or `{"id": ..., "error": ...}`), in the input order
+        '''
+        pending = queue.Queue()
+        stop = threading.Event()
+        failure = []
+
+        def send():
+            try:
+                for resume in resumes:
+                    if stop.is_set():
+                        break
+                    request = self.__encode(resume, fields, tier)
+                    pending.put(request['id'])
+                    self.__send(request)
+            except Exception as error:
+                failure.append(error)
+            finally:
+                pending.put(_END)
+
+        sender = threading.Thread(target=send, name='daemon-client-sender', daemon=True)
+        sender.start()
+
+        finished = False
+        try:
+            while True:
+                request_id = pending.get()
+                if request_id is _END:
+                    finished = True
+                    break
+
+                response = self.__receive()
+                if response.get('id') != request_id:
+                    raise ConnectionError(f"Unexpected response {response.get('id')} to request {request_id}")
+                yield response
+
+            if failure:
+                raise failure[0]
+        finally:
+            # Stop sending and read the responses of the requests already sent (the daemon may be waiting
+            # for them to be read), so the connection can be used again
+            stop.set()
+            try:
+                while not finished:
+                    if pending.get() is _END:
+                        finished = True
+                    else:
+                        self.__receive()
+            except (OSError, ValueError):
+                pass
+            sender.join()
+
+    def imap(self, resumes, fields=None, tier='full', skip_errors=False):
+        '''
+        Parses the given resumes in the daemon, the requests being pipelined (see `responses`)
+
+        :param skip_errors: yield None for the resumes that cannot be parsed instead of raising
+        :return: iterator over the extracted details, in the input order
+        '''
+        for response in self.responses(resumes, fields, tier):
+            if 'error' in response:
+                if not skip_errors:
+                    raise ValueError(response['error'])
+                yield None
+            else:
+                yield response['result']
+
+    def parse_many(self, resumes, fields=None, tier='full', skip_errors=False) -> list:
+        '''
+        Parses the given resumes in the daemon (see `imap`)
+
+        :return: list of the extracted details, in the input order
+        '''
+        return list(self.imap(resumes, fields, tier, skip_errors))
+
+    def parse(self, resume, fields=None, tier='full') -> dict:
+        '''
+        Parses one resume in the daemon
+
+        :return: dictionary of the extracted resume details (see `ResumeParser.parse`)
+        '''
+        return self.parse_many([resume], fields, tier)[0]
+
+    def close(self):
+        '''
+        Closes the connection
+        '''
+        self.__wfile.close()
+        self.__rfile.close()
+        self.__socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="load the parser and answer the requests")
+    serve.add_argument('--socket', default=None, help="socket path, $XDG_RUNTIME_DIR/resume-analyzer-<uid>.sock by default")
+    serve.add_argument('--stdio', action='store_true', help="answer the requests of stdin on stdout instead of a socket")
+    serve.add_argument('--batch-size', type=int, default=cs.DAEMON_BATCH_SIZE)
+    serve.add_argument('--model-dir', default=None)
+    serve.add_argument('--backend', default=cs.NER_BACKEND, choices=cs.NER_BACKENDS)
+    serve.add_argument('--cache', default=None, help="SQLite file of the results cache")
+    serve.add_argument('--dedup', default=None, help="SQLite file of the near-duplicate index")
+
+    parse = commands.add_parser('parse', help="parse resumes in the daemon, one JSON line per resume")
+    parse.add_argument('resumes', nargs='+')
+    parse.add_argument('--socket', default=None, help="socket path, $XDG_RUNTIME_DIR/resume-analyzer-<uid>.sock by default")
+    parse.add_argument('--fields', default=None, help="comma-separated fields, all of them by default")
+    parse.add_argument('--tier', default='full', choices=cs.TIERS)
+    parse.add_argument('--send-bytes', action='store_true', help="send the file contents instead of their paths")
+
+    for command in ('ping', 'stop'):
+        commands.add_parser(command).add_argument('--socket', default=None, help="socket path, $XDG_RUNTIME_DIR/resume-analyzer-<uid>.sock by default")
+
+    args = arg_parser.parse_args()
+
+    if args.command == 'serve':
+        parser_kwargs = {'model_dir': args.model_dir, 'ner_backend': args.backend}
+        if args.cache:
+            from .cache import ResultCache
+            parser_kwargs['cache'] = ResultCache(path=args.cache)
+        if args.dedup:
+            from .dedup import NearDuplicateIndex
+            parser_kwargs['dedup'] = NearDuplicateIndex(args.dedup)
+
+        if args.stdio:
+            serve_stdio(batch_size=args.batch_size, **parser_kwargs)
+        else:
+            with ParserDaemon(args.socket, batch_size=args.batch_size, **parser_kwargs) as daemon:
+                print(f"Listening on {daemon.path}", file=sys.stderr)
+                daemon.serve_forever()
+        return
+
+    with DaemonClient(args.socket, send_bytes=getattr(args, 'send_bytes', False)) as client:
+        if args.command == 'ping':
+            print('pong' if client.ping() else 'no answer')
+        elif args.command == 'stop':
+            client.shutdown()
+        else:
+            fields = args.fields.split(',') if args.fields else None
+            resumes = [sys.stdin.read() if resume == '-' else resume for resume in args.resumes]
+
+            failed = 0
+            for item_id, response in zip(args.resumes, client.responses(resumes, fields, args.tier)):
+                if 'error' in response:
+                    failed += 1
+                    print(f"{item_id}: {response['error']}", file=sys.stderr)
+                else:
+                    print(json.dumps({'id': item_id, **response['result']}))
+            sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
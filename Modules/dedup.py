@@ -0,0 +1,191 @@
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+from . import utils
+from . import constants as cs
+
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def slim_ner_output(output: list[dict]) -> list[dict]:
+    '''
+    Helper function to keep only what `utils.preprocess_bert_output` reads from a raw NER output
+
+    :param output: raw token classification output of one text
+    :return: list of {entity, word, start, end} dictionaries, JSON serializable
+    '''
+    return [{'entity': item['entity'], 'word': item['word'], 'start': int(item['start']), 'end': int(item['end'])}
+            for item in output]
+
+
+class NearDuplicateIndex(object):
+    '''
+    Index of the NER outputs of the resumes already parsed, found again
+    from slightly edited copies of their text.
+
+    Every text gets a MinHash signature of its word shingles (lower-cased
+    words, so the layout of the export tool does not matter). The
+    signatures are split into LSH bands, and the texts sharing a band with
+    the new one are compared on their whole signature: the most similar
+    one above `threshold` (estimated Jaccard similarity) is a near
+    duplicate, provided its person names still appear in the new text
+    (see `constants.DEDUP_CHECKED_ENTITIES`). Its NER output is then
+    reused, and every other extractor runs on the new text.
+
+    The index is a SQLite database (in memory without `path`), so it
+    survives restarts, can be shared by several processes and scales to
+    millions of texts. `namespace` keeps apart the outputs of different
+    models.
+    '''
+
+    def __init__(self,
+                 path: str = None,
+                 threshold: float = cs.DEDUP_THRESHOLD,
+                 num_perm: int = cs.DEDUP_NUM_PERM,
+                 bands: int = cs.DEDUP_BANDS,
+                 shingle: int = cs.DEDUP_SHINGLE):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.__threshold = threshold
+        self.__num_perm = num_perm
+        self.__bands = bands
+        self.__shingle = shingle
+
+        # Universal hash functions (a * x + b) mod p, the same ones for every index
+        generator = np.random.RandomState(1)
+        self.__a = generator.randint(1, 1 << 61, size=num_perm, dtype=np.uint64)
+        self.__b = generator.randint(0, 1 << 61, size=num_perm, dtype=np.uint64)
+
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self.__db.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.__db.execute("CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY, signature BLOB NOT NULL, output TEXT NOT NULL)")
+        self.__db.execute("CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, id INTEGER NOT NULL, "
+                          "PRIMARY KEY (bucket, id)) WITHOUT ROWID")
+        self.__check_settings()
+        self.__db.commit()
+
+    def __check_settings(self):
+        # The signatures of a persisted index are only comparable with the same settings
+        settings = {'num_perm': str(self.__num_perm), 'bands': str(self.__bands), 'shingle': str(self.__shingle)}
+        for name, value in settings.items():
+            self.__db.execute("INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)", (name, value))
+
+        stored = dict(self.__db.execute("SELECT name, value FROM settings").fetchall())
+        if any(stored[name] != value for name, value in settings.items()):
+            raise ValueError(f"Index built with other settings: {stored}")
+
+    def __len__(self):
+        with self.__lock:
+            return self.__db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def signature(self, text: str):
+        '''
+        Returns the MinHash signature of a text (None when it has no words)
+        '''
+        words = cs.WORD_REGEX.findall(text.lower())
+        if not words:
+            return None
+
+        k = self.__shingle
+        shingles = {' '.join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+
+        # Minimum of every hash function over the shingles (wrapping products, as in the usual MinHash)
+        permuted = np.bitwise_and((hashes[:, np.newaxis] * self.__a + self.__b) % MERSENNE_PRIME, MAX_HASH)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def __buckets(self, signature, namespace: str) -> list[int]:
+        rows = self.__num_perm // self.__bands
+        buckets = []
+        for band in range(self.__bands):
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(f"{namespace}\0{band}\0".encode('utf-8'))
+            digest.update(signature[band * rows:(band + 1) * rows].tobytes())
+            buckets.append(int.from_bytes(digest.digest(), 'little', signed=True))
+        return buckets
+
+    def lookup(self, signature, text: str, namespace: str = ''):
+        '''
+        Finds the NER output of a near duplicate of a text
+
+        :param signature: signature of the text (see `signature`)
+        :param text: the text, to check the entities of the near duplicates
+        :param namespace: namespace the near duplicate was added to
+        :return: (NER output, similarity) of the most similar near duplicate, or None
+        '''
+        if signature is None:
+            return None
+
+        buckets = self.__buckets(signature, namespace)
+        with self.__lock:
+            candidates = self.__db.execute(
+                f"SELECT id, signature FROM documents WHERE id IN "
+                f"(SELECT id FROM buckets WHERE bucket IN ({','.join('?' * len(buckets))}))", buckets).fetchall()
+
+            similarities = sorted(((np.count_nonzero(np.frombuffer(stored, dtype=np.uint32) == signature) / self.__num_perm, id_)
+                                   for id_, stored in candidates), reverse=True)
+
+            for similarity, id_ in similarities:
+                if similarity < self.__threshold:
+                    break
+
+                output = json.loads(self.__db.execute("SELECT output FROM documents WHERE id = ?", (id_,)).fetchone()[0])
+                if self.__has_entities(output, text):
+                    return output, similarity
+
+        return None
+
+    @staticmethod
+    def __has_entities(output: list[dict], text: str) -> bool:
+        # Different candidates can share a template: their names must not be swapped
+        normalized = ' '.join(text.lower().split())
+        entities = [entity for entity in utils.preprocess_bert_output(output) if entity['entity'] in cs.DEDUP_CHECKED_ENTITIES]
+        return all(' '.join(entity['text'].lower().split()) in normalized for entity in entities)
+
+    def add(self, signature, output: list[dict], namespace: str = ''):
+        '''
+        Adds the NER output of a text
+
+        :param signature: signature of the text (see `signature`), nothing is added when it is None
+        :param output: raw NER output of the text
+        :param namespace: namespace of the output (e.g. the model that produced it)
+        '''
+        if signature is None:
+            return
+
+        buckets = self.__buckets(signature, namespace)
+        with self.__lock:
+            cursor = self.__db.execute("INSERT INTO documents (signature, output) VALUES (?, ?)",
+                                       (signature.tobytes(), json.dumps(slim_ner_output(output))))
+            self.__db.executemany("INSERT OR IGNORE INTO buckets (bucket, id) VALUES (?, ?)",
+                                  [(bucket, cursor.lastrowid) for bucket in buckets])
+            self.__db.commit()
+
+    def reopen(self):
+        '''
+        Opens a new connection to the database file, without closing the inherited one
+        (a forked process must not use the SQLite connection of its parent). An index
+        in memory keeps its connection: the forked process works on its own copy.
+        '''
+        self.__lock = threading.Lock()
+        if self.__path and self.__db is not None:
+            self.__db = sqlite3.connect(self.__path, check_same_thread=False)
+
+    def close(self):
+        '''
+        Closes the database
+        '''
+        with self.__lock:
+            if self.__db is not None:
+                self.__db.close()
+                self.__db = None
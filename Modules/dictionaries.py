@@ -0,0 +1,107 @@
+'''
+Compact skill and company dictionaries
+
+The CSV files are loaded into Python sets by default, so every process
+holds its own copy of tens of thousands of strings. A dictionary built
+once with `build_dictionary` (a marisa-trie saved next to the CSV file)
+is memory-mapped instead: it loads in milliseconds, its pages are shared
+by every process using it, and it answers the prefix queries of the
+skill and company matchers.
+
+Usage (from the repository root, after changing a CSV file):
+    python -m Modules.dictionaries [--skills Data/skills.csv] [--companies Data/companies.csv]
+'''
+import os
+import argparse
+
+try:
+    import marisa_trie
+except ImportError:
+    marisa_trie = None
+
+from . import utils
+from . import constants as cs
+from .matchers import AhoCorasick, SkillIndex, TrieSkillIndex, TrieWordMatcher
+
+
+SKILLS_FILE = cs.workspace_dir + '/Data/skills.csv'
+COMPANIES_FILE = cs.workspace_dir + '/Data/companies.csv'
+
+
+def get_dictionary_path(csv_file: str) -> str:
+    '''
+    Helper function to get the path of the compact dictionary of a CSV file
+    '''
+    return os.path.splitext(csv_file)[0] + cs.DICTIONARY_EXTENSION
+
+
+def build_dictionary(csv_file: str, column: str, path: str = None) -> str:
+    '''
+    Builds the compact dictionary (marisa-trie) of a CSV column
+
+    :param csv_file: CSV file of the values
+    :param column: column of the values
+    :param path: output file, next to the CSV file by default (see `get_dictionary_path`)
+    :return: path of the saved dictionary
+    '''
+    if marisa_trie is None:
+        raise ImportError("Building dictionaries requires marisa-trie (pip install marisa-trie)")
+
+    path = path or get_dictionary_path(csv_file)
+    trie = marisa_trie.Trie(utils.load_csv_column(csv_file, column))
+
+    # Replaced atomically, so the processes reading the previous dictionary are not affected
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    trie.save(temp_path)
+    os.replace(temp_path, path)
+
+    return path
+
+
+def load_dictionary(csv_file: str, column: str):
+    '''
+    Loads the values of a CSV column, from its compact dictionary when possible
+
+    The dictionary is memory-mapped when marisa-trie is installed and the
+    dictionary is not older than the CSV file, otherwise the CSV file is read.
+
+    :param csv_file: CSV file of the values
+    :param column: column of the values
+    :return: memory-mapped `marisa_trie.Trie`, or set of the values
+    '''
+    path = get_dictionary_path(csv_file)
+    if marisa_trie is not None and os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_file):
+        trie = marisa_trie.Trie()
+        trie.mmap(path)
+        return trie
+
+    return utils.load_csv_column(csv_file, column)
+
+
+def get_skill_index(skills):
+    '''
+    Helper function to get the skill finder of a loaded skills dictionary (trie or set)
+    '''
+    return SkillIndex(skills) if isinstance(skills, (set, frozenset)) else TrieSkillIndex(skills)
+
+
+def get_company_matcher(companies):
+    '''
+    Helper function to get the whole-word matcher of a loaded companies dictionary (trie or set)
+    '''
+    return AhoCorasick(companies) if isinstance(companies, (set, frozenset)) else TrieWordMatcher(companies)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--skills', default=SKILLS_FILE)
+    arg_parser.add_argument('--companies', default=COMPANIES_FILE)
+    args = arg_parser.parse_args()
+
+    for csv_file, column in ((args.skills, 'Skill'), (args.companies, 'Company')):
+        path = build_dictionary(csv_file, column)
+        print(f"{path}: {len(load_dictionary(csv_file, column))} entries, {os.path.getsize(path) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
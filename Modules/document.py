@@ -0,0 +1,336 @@
+import io
+import re
+import zipfile
+import threading
+from bisect import bisect_right
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import pymupdf
+from docx2txt.docx2txt import xml2text
+from xml.etree import ElementTree
+
+from . import utils
+from . import constants as cs
+
+
+DOCX_HEADER_XML = re.compile(r'word/header[0-9]*\.xml')
+DOCX_FOOTER_XML = re.compile(r'word/footer[0-9]*\.xml')
+DOCX_DOCUMENT_XML = 'word/document.xml'
+DOCX_RELS_XML = 'word/_rels/document.xml.rels'
+DOCX_APP_XML = 'docProps/app.xml'
+
+RESUME_SECTIONS = set(cs.RESUME_SECTIONS)
+
+# Page worker pools, by number of workers (created on first use, shared by all the parsers)
+_page_pools = {}
+_page_pools_lock = threading.Lock()
+
+# The pools are created late, when the process may already run threads (NER model, parser
+# front-ends), which `fork` would copy in any state: the workers start from a clean process
+# instead, they only need the bytes of the document
+PAGE_WORKERS_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _get_page_pool(workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    with _page_pools_lock:
+        if workers not in _page_pools:
+            context = multiprocessing.get_context(PAGE_WORKERS_START_METHOD)
+            _page_pools[workers] = concurrent.futures.ProcessPoolExecutor(workers, mp_context=context)
+        return _page_pools[workers]
+
+
+def _drop_page_pool(workers: int, pool: concurrent.futures.ProcessPoolExecutor):
+    # A broken pool (e.g. a worker was killed) is replaced by a new one on next use
+    with _page_pools_lock:
+        if _page_pools.get(workers) is pool:
+            del _page_pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _decode_page(page):
+    links = [link["uri"] for link in page.get_links() if link["kind"] == 2 and link["uri"]]
+    return page.get_text(), links
+
+
+def _decode_pages(data: bytes, start: int, stop: int):
+    # Runs in a page worker, which opens its own copy of the document
+    with pymupdf.open(stream=data, filetype="pdf") as pdf_document:
+        return [_decode_page(pdf_document[page_number]) for page_number in range(start, stop)]
+
+
+def _decode_pages_parallel(pdf_document, data: bytes, page_count: int, workers: int):
+    # Pages 2..n are split into one range per worker, page 1 is decoded here in the meantime
+    bounds = [1 + k * (page_count - 1) // workers for k in range(workers + 1)]
+    ranges = [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+    pool = _get_page_pool(workers)
+    try:
+        futures = [pool.submit(_decode_pages, data, start, stop) for start, stop in ranges]
+    except BrokenProcessPool:
+        _drop_page_pool(workers, pool)
+        futures = []
+
+    try:
+        yield _decode_page(pdf_document[0])
+        for k, (start, stop) in enumerate(ranges):
+            pages = None
+            if k < len(futures):
+                try:
+                    pages = futures[k].result()
+                except BrokenProcessPool:
+                    _drop_page_pool(workers, pool)
+                    futures = futures[:k]
+
+            # The pages a broken pool did not decode are decoded here
+            if pages is None:
+                pages = [_decode_page(pdf_document[page_number]) for page_number in range(start, stop)]
+            yield from pages
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def iter_document_pages(pdf_document, data=None, max_pages: int = None, max_chars: int = None, workers: int = 0):
+    '''
+    Generator over the pages of an open PDF document, decoded one at a time
+
+    :param pdf_document: open `pymupdf.Document`
+    :param data: bytes of the document, needed by the page workers only
+    :param max_pages: maximum number of pages decoded (all of them by default)
+    :param max_chars: maximum number of characters of text, the last page is cut (no limit by default)
+    :param workers: number of page workers decoding the documents of at least `PDF_PARALLEL_PAGES` pages
+    :return: iterator of (page text, page hyperlinks) pairs, in page order
+    '''
+    page_count = len(pdf_document) if max_pages is None else min(max_pages, len(pdf_document))
+
+    # Daemonic processes (e.g. the workers of a `ParserPool`) cannot start page workers
+    if workers > 1 and data is not None and page_count >= cs.PDF_PARALLEL_PAGES \
+            and not multiprocessing.current_process().daemon:
+        pages = _decode_pages_parallel(pdf_document, data, page_count, workers)
+    else:
+        pages = (_decode_page(pdf_document[page_number]) for page_number in range(page_count))
+
+    chars = 0
+    for text, links in pages:
+        if max_chars is not None and chars + len(text) >= max_chars:
+            yield text[:max_chars - chars], links
+            pages.close()
+            return
+
+        chars += len(text)
+        yield text, links
+
+
+def iter_pdf_pages(pdf_file, max_pages: int = None, max_chars: int = None, workers: int = 0):
+    '''
+    Generator over the pages of a PDF file, decoded one at a time: the first
+    pages can be used while the next ones are not decoded yet, and the pages
+    past the budgets are never decoded
+
+    :param pdf_file: in-memory PDF file, bytes or path of the PDF file
+    :return: iterator of (page text, page hyperlinks) pairs (see `iter_document_pages`)
+    '''
+    if isinstance(pdf_file, str):
+        pdf_file = utils.load_to_memory(pdf_file)
+    data = pdf_file.getvalue() if isinstance(pdf_file, io.BytesIO) else pdf_file
+
+    with pymupdf.open(stream=data, filetype="pdf") as pdf_document:
+        yield from iter_document_pages(pdf_document, data, max_pages, max_chars, workers)
+
+
+class ResumeDocument(object):
+    '''
+    A resume file loaded once per parse.
+
+    The underlying PDF/DOCX is opened a single time and the text, the
+    hyperlinks and the number of pages are all read from that handle,
+    so none of the extractors has to re-open the file.
+
+    Only the first `max_pages` pages (PDF) and `max_chars` characters are
+    read, and the pages of large PDFs are decoded by `page_workers` worker
+    processes when it is more than 1 (see `iter_document_pages`).
+    '''
+
+    def __init__(self, resume, ext: str, max_pages: int = None, max_chars: int = None, page_workers: int = 0):
+        if ext not in ('pdf', 'docx'):
+            raise ValueError("Unsupported file extension")
+
+        self.ext = ext
+        self.text = ''
+        self.pages = []
+        self.hyperlinks = set()
+        self.no_of_pages = None
+
+        if isinstance(resume, str):
+            resume = utils.load_to_memory(resume)
+
+        if ext == 'pdf':
+            self.__load_pdf(resume, max_pages, max_chars, page_workers)
+        else:
+            self.__load_docx(resume)
+            if max_chars is not None:
+                self.text = self.text[:max_chars]
+
+    def __load_pdf(self, pdf_file: io.BytesIO, max_pages: int, max_chars: int, page_workers: int):
+        with pymupdf.open(stream=pdf_file, filetype="pdf") as pdf_document:
+            # The page workers get their own copy of the bytes (large documents only)
+            data = pdf_file.getvalue() if page_workers > 1 and len(pdf_document) >= cs.PDF_PARALLEL_PAGES else None
+            for text, links in iter_document_pages(pdf_document, data, max_pages, max_chars, page_workers):
+                self.pages.append(text)
+                self.hyperlinks.update(links)
+
+            self.no_of_pages = len(pdf_document)
+
+        self.text = ''.join(self.pages)
+
+    def __load_docx(self, docx_file: io.BytesIO):
+        with zipfile.ZipFile(docx_file, "r") as archive:
+            filelist = archive.namelist()
+
+            # Text (same layout as `docx2txt.process`: headers, body, footers)
+            text = ''
+            for fname in filelist:
+                if DOCX_HEADER_XML.match(fname):
+                    text += xml2text(archive.read(fname))
+
+            text += xml2text(archive.read(DOCX_DOCUMENT_XML))
+
+            for fname in filelist:
+                if DOCX_FOOTER_XML.match(fname):
+                    text += xml2text(archive.read(fname))
+
+            self.text = text.strip()
+
+            # Hyperlinks (external relationships of the main document part)
+            if DOCX_RELS_XML in filelist:
+                rels = ElementTree.fromstring(archive.read(DOCX_RELS_XML))
+                for rel in rels:
+                    if "hyperlink" in rel.get('Type', '') and rel.get('Target'):
+                        self.hyperlinks.add(rel.get('Target'))
+
+            # Number of pages
+            page_count = 0
+            if DOCX_APP_XML in filelist:
+                app_xml = archive.read(DOCX_APP_XML).decode("utf-8")
+                matches = cs.DOCX_PAGES_REGEX.findall(app_xml)
+                page_count = matches[0][1] if matches else 0
+
+            self.no_of_pages = page_count
+
+
+class TextDocument(object):
+    '''
+    Normalized text of a resume with the offsets of its lines and sections.
+
+    Built once per parse, so the extractors work on character offsets of
+    `text` instead of splitting it again. `text` is also the text given to
+    the NER model, so the `start`/`end` offsets of its entities point into
+    it (see `line_of`).
+
+    A section starts after its header line and ends before the next header
+    line, a header being a line of less than 5 alphabetic words one of
+    which is a section name not seen before (`constants.RESUME_SECTIONS`),
+    the first one naming the section.
+    '''
+
+    def __init__(self, text: str):
+        self.text = text
+        self.__line_starts = None
+        self.__sections = None
+
+    @staticmethod
+    def __find_line_starts(text: str) -> list[int]:
+        return [0] + [match.end() for match in cs.LINE_BREAK_REGEX.finditer(text)]
+
+    @property
+    def line_starts(self) -> list[int]:
+        '''
+        Offset of the first character of every line
+        '''
+        if self.__line_starts is None:
+            self.__line_starts = self.__find_line_starts(self.text)
+        return self.__line_starts
+
+    def line_span(self, index: int) -> tuple[int, int]:
+        '''
+        Returns the (start, end) offsets of a line, without its line break
+        '''
+        if index == 0 and self.__line_starts is None:
+            end = self.text.find('\n')
+            return 0, len(self.text) if end < 0 else end
+
+        line_starts = self.line_starts
+        end = line_starts[index + 1] - 1 if index + 1 < len(line_starts) else len(self.text)
+        return line_starts[index], end
+
+    def line(self, index: int) -> str:
+        '''
+        Returns a line of the text
+        '''
+        start, end = self.line_span(index)
+        return self.text[start:end]
+
+    def line_of(self, offset: int) -> int:
+        '''
+        Returns the index of the line containing a character offset
+        '''
+        return bisect_right(self.line_starts, offset) - 1
+
+    @property
+    def sections(self) -> dict:
+        '''
+        (start, end) offsets of every section of the text, by section name
+        '''
+        if self.__sections is None:
+            self.__sections = self.__find_sections()
+        return self.__sections
+
+    def __find_sections(self) -> dict:
+        text = self.text
+        sections = {}
+        current = None
+        checked = None
+
+        # Only the lines containing a section name can be headers. Lower-casing keeps the lines, and the
+        # offsets too unless a character expands (then the lines of the lower-cased text are indexed).
+        lowered = text.lower()
+        line_starts = self.line_starts if len(lowered) == len(text) else self.__find_line_starts(lowered)
+
+        for match in cs.SECTION_HEADER_REGEX.finditer(lowered):
+            index = bisect_right(line_starts, match.start()) - 1
+            if index == checked:
+                continue
+            checked = index
+
+            start, end = self.line_span(index)
+            words = [word for word in text[start:end].lower().split() if word.isalpha()]
+            if len(words) >= 5:  # Titles are usually less then 5 words
+                continue
+
+            # The first section name of the line not seen before (a repeated one does not hide it)
+            name = next((word for word in words if word in RESUME_SECTIONS and word not in sections), None)
+            if name is None:
+                continue
+
+            if current is not None:
+                sections[current] = (sections[current][0], max(sections[current][0], start - 1))
+            sections[name] = (min(end + 1, len(text)), len(text))
+            current = name
+
+        return sections
+
+    def section_text(self, name: str) -> str:
+        '''
+        Returns the text of a section (None if the resume has no such section)
+        '''
+        if name not in self.sections:
+            return None
+
+        start, end = self.sections[name]
+        return self.text[start:end]
+
+    def section_lines(self, name: str) -> list[str]:
+        '''
+        Returns the non-empty lines of a section, stripped
+        '''
+        return [line.strip() for line in (self.section_text(name) or '').split('\n') if line.strip()]
@@ -6,6 +6,8 @@ from docx import Document
 
 from . import constants as cs
 from . import utils
+from .document import ResumeDocument, TextDocument, iter_pdf_pages
+from .matchers import AhoCorasick, TrieWordMatcher
 
 
 def handle_io_bytes(func):
@@ -44,18 +46,11 @@ def extract_text_from_pdf(pdf_file):
     Helper function to extract the plain text from .pdf files
 
     :param pdf_path: path to PDF file to be extracted (remote or local)
-    :return: iterator of string of extracted text
+    :return: string of extracted text
     '''
-    # Open PDF file
-    with pymupdf.open(stream=pdf_file, filetype="pdf") as pdf_document:
-        # Initialize text variable
-        text = ""
-        # Iterate through pages
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            text += page.get_text()
-
-    return text
+    # Pages are decoded one at a time (see `document.iter_pdf_pages`) and joined once
+    data = pdf_file if isinstance(pdf_file, io.BytesIO) else pdf_file.read()
+    return ''.join(text for text, _ in iter_pdf_pages(data))
 
 
 def extract_text(resume: str, extension: str = None):
@@ -63,19 +58,21 @@ def extract_text(resume: str, extension: str = None):
     Wrapper function to detect the file extension and call text
     extraction function accordingly
 
-    :param resume: resume text or path of file of which text is to be extracted
+    :param resume: resume text, loaded `ResumeDocument` or path of file of which text is to be extracted
     :param extension: extension of file `file_name`
     '''
     text = ''
-    if extension == 'pdf':
+    if isinstance(resume, ResumeDocument):
+        text = resume.text
+    elif extension == 'pdf':
         text = extract_text_from_pdf(resume)
     elif extension == 'docx':
         text = extract_text_from_docx(resume)
     else:
         text = resume
 
-    text = [line.replace('\t', ' ') for line in text.split('\n') if line]
-    return '\n'.join(text)
+    # Tabs are replaced in the whole text at once, then the empty lines are dropped
+    return '\n'.join(filter(None, text.replace('\t', ' ').split('\n')))
 
 
 def extract_entities_wih_custom_model(nlp_entities: list[dict]):
@@ -104,43 +101,13 @@ def extract_entity_sections(text: str) -> dict:
     Helper function to extract all the raw text from sections of
     resume specifically for professionals
 
-    :param text: Raw text of resume
+    :param text: Raw text of resume (or its `TextDocument`)
     :return: dictionary of entities
     '''
-    assert isinstance(text, str), "Input text must be a string"
-
-    resume_lines = [i.strip() for i in text.split('\n')]
-    resume_sections = set(cs.RESUME_SECTIONS)
-
-    entities = {}
-    key = ""
+    document = text if isinstance(text, TextDocument) else TextDocument(text)
+    assert isinstance(document.text, str), "Input text must be a string"
 
-    for line in resume_lines:
-        line = line.strip()
-        if not line:  # If line is empty
-            continue
-
-        # Remove all non-alphabet characters
-        words_list = [word for word in line.lower().split() if word.isalpha()]
-
-        # Check if the line is a section header
-        if len(words_list) < 5:  # Titles are usually less then 5 words
-
-            p_key = set(words_list) & resume_sections
-
-            if p_key:  # If there is a match
-
-                # Convert the set of matches to a list for accessibility
-                # Access the first element
-                p_key = list(p_key)[0]
-
-                if p_key not in entities.keys():
-                    entities[p_key] = []
-                    key = p_key
-                    continue
-
-        if key:
-            entities[key].append(line)
+    entities = {name: document.section_lines(name) for name in document.sections}
 
     assert isinstance(entities, dict), "Output entities must be a dictionary"
     return entities
@@ -152,10 +119,11 @@ def extract_email(text: str):
 
     :param text: plain text extracted from resume file
     '''
-    email = re.findall(cs.EMAIL_PATTERN, text)
+    # Only the first email is kept, the scan stops there
+    email = cs.EMAIL_REGEX.search(text)
     if email:
         try:
-            return email[0].split()[0].strip(';')
+            return email.group().split()[0].strip(';')
         except IndexError:
             return None
 
@@ -168,8 +136,7 @@ def extract_mobile_numbers(text: str, custom_regex: str = None):
     :return: string of extracted mobile numbers
     '''
     if not custom_regex:
-        mob_num_regex = cs.PHONE_PATTERN
-        matches = re.findall(mob_num_regex, text)
+        matches = cs.PHONE_REGEX.findall(text)
     else:
         matches = re.findall(custom_regex, text)
     if matches:
@@ -178,37 +145,65 @@ def extract_mobile_numbers(text: str, custom_regex: str = None):
         return phone
 
 
-def extract_skills(skills_section, skill_set, pattern= cs.SKILL_PATTERN):
+def extract_skills(skills_section, skill_set, pattern= cs.SKILL_REGEX):
     '''
     Helper function to extract skills from skills section
 
     :param skills_section: string of skills section extracted from resume
+    :param skill_set: known skills in their no-space form (set, trie or `SkillIndex`/`TrieSkillIndex`)
+    :param pattern: pattern of the candidate skills (the items of the section)
     :return: list of skills extracted
     '''
-
-    skills = re.findall(pattern, skills_section)
+    skills = re.findall(pattern, skills_section) if isinstance(pattern, str) else pattern.findall(skills_section)
     skills = list({skill.capitalize() for skill in skills if utils.preprocess_skill(skill) in skill_set})
 
     return skills
 
 
-def extract_companies(text: str, companies_list: list):
+def find_skills(text: str, skill_index):
+    '''
+    Helper function to find the known skills anywhere in a text (longest matches of the skill index)
+
+    Section headers and contact keywords are dropped, and so are the single
+    words that are stopwords or shorter than `SKILL_MIN_WORD_LENGTH`: the
+    skills dictionary lists many common words, which every resume contains.
+
+    :param text: plain text extracted from resume file
+    :param skill_index: `SkillIndex`/`TrieSkillIndex` of the known skills
+    :return: list of skills found
+    '''
+    skills = set()
+    for skill in skill_index.find(text):
+        key = utils.preprocess_skill(skill)
+        if key in cs.SKILL_EXCLUDED:
+            continue
+        if cs.WORD_REGEX.fullmatch(skill) and (len(skill) < cs.SKILL_MIN_WORD_LENGTH or skill in cs.SKILL_STOPWORDS):
+            continue
+        skills.add(skill.capitalize())
+
+    return list(skills)
+
+
+def extract_companies(text: str, companies):
     '''
     Helper function to extract companies from text
+
+    :param text: plain text extracted from resume file
+    :param companies: `AhoCorasick`/`TrieWordMatcher` matcher of the company names (or an iterable of names)
+    :return: list of companies mentioned in the text
     '''
-    companies = [company for company in companies_list if re.search(r'\b'+company+r'\b', text)]
-    return companies
+    if not isinstance(companies, (AhoCorasick, TrieWordMatcher)):
+        companies = AhoCorasick(companies)
+
+    return companies.find_words(text)
 
 
 def extract_college(text: str):
     '''
     Helper function to extract college from text
     '''
-    lines = text.split('\n')
-    
-    colleges = set()
-    for line in lines:
-        colleges.update(re.findall(cs.COLLEGE_PATTERN, line))
+    # The pattern never spans several lines, so the whole text is searched at once
+    colleges = set(cs.COLLEGE_REGEX.findall(text))
     
     return list(colleges)
 
@@ -220,7 +215,7 @@ def extract_links_from_text(text: str):
     :param text: plain text extracted from resume file
     :return: string of extracted links
     '''
-    links = re.findall(cs.URL_PATTERN, text)
+    links = cs.URL_REGEX.findall(text)
     links = {link for link in list(links) if utils.validate_link(link)}
     return links
 
@@ -229,33 +224,16 @@ def extract_highest_degree(text: str):
     '''
     Helper function to extract degree from text
     '''
-    # Define Patterns
-    patterns = {}
+    # Single scan over the text: every match names its degree type, the highest one wins
+    ranks = list(cs.DEGREE_RANKS)
+    highest = len(ranks)
     
-    for degree_type, words in cs.DEGREE.items():
-        concat = '|'.join([degree for degree in words])
-        patterns[degree_type] = re.compile(r'\b' + concat + r'\b', re.IGNORECASE)
+    for match in cs.DEGREE_REGEX.finditer(text):
+        highest = min(highest, ranks.index(match.lastgroup))
+        if highest == 0:
+            break
     
-    
-    # Search for degree types in the resume text
-    phd_match = re.search(patterns['phd'], text)
-    masters_match = re.search(patterns['master'], text)
-    bachelors_match = re.search(patterns['bachelor'], text)
-    diploma_match = re.search(patterns['diploma'], text)
-    high_school_match = re.search(patterns['high_school'], text)
-    
-    if phd_match:
-        return 'PhD'
-    elif masters_match:
-        return 'Master'
-    elif bachelors_match:
-        return 'Bachelor'
-    elif diploma_match:
-        return 'Diploma'
-    elif high_school_match:
-        return 'High School'
-    else:
-        return 'Unknown'
+    return cs.DEGREE_RANKS[ranks[highest]] if highest < len(ranks) else 'Unknown'
 
 @handle_io_bytes
 def extract_hyperlinks_from_pdf(pdf_file):
@@ -288,7 +266,10 @@ def extract_hyperlinks_from_docx(docx_file):
 def extract_hyperlinks(resume_file: str, extension: str = None):
     links = set()
 
-    if extension == 'pdf':
+    if isinstance(resume_file, ResumeDocument):
+        links.update(resume_file.hyperlinks)
+
+    elif extension == 'pdf':
         links.update(extract_hyperlinks_from_pdf(resume_file))
 
     elif extension == 'docx':
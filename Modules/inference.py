@@ -0,0 +1,194 @@
+import os
+
+from . import constants as cs
+
+
+def load_ner_pipeline(model: str = cs.NER_MODEL, model_dir: str = None, backend: str = cs.NER_BACKEND):
+    '''
+    Helper function to load the token classification pipeline of the NER model
+
+    `transformers` (and `torch`) are only imported here, importing them takes
+    seconds and is only needed once the model is actually used.
+
+    Every backend runs behind the same `transformers` pipeline, so the raw
+    output (and what `utils.preprocess_bert_output` expects) does not change:
+        - `torch`: fp32 PyTorch model
+        - `torch-int8`: PyTorch model with its linear layers dynamically quantized to int8 (CPU only)
+        - `onnx`: ONNX Runtime session (needs `optimum[onnxruntime]`), exported from the PyTorch
+          model when `model_dir` has no ONNX model (see `download_model`)
+
+    :param model: model id on the Hugging Face hub
+    :param model_dir: local directory of the model (see `download_model`), loaded without network access
+    :param backend: inference backend, one of `constants.NER_BACKENDS`
+    :return: `transformers` token classification pipeline
+    '''
+    if backend not in cs.NER_BACKENDS:
+        raise ValueError(f"Unsupported NER backend: {backend}")
+
+    from transformers import pipeline, AutoTokenizer
+
+    source = model_dir or model
+    tokenizer = AutoTokenizer.from_pretrained(source, local_files_only=bool(model_dir))
+
+    if backend == 'onnx':
+        ner_model = load_onnx_model(source, local_files_only=bool(model_dir))
+    else:
+        from transformers import AutoModelForTokenClassification
+
+        ner_model = AutoModelForTokenClassification.from_pretrained(source, local_files_only=bool(model_dir))
+        if backend == 'torch-int8':
+            ner_model = quantize_model(ner_model)
+
+    return pipeline("token-classification", model=ner_model, tokenizer=tokenizer)
+
+
+def quantize_model(ner_model):
+    '''
+    Helper function to quantize the linear layers of a PyTorch model to int8 (dynamic quantization)
+
+    Weights are stored in int8 and activations are quantized on the fly,
+    which speeds up CPU inference of BERT-like models at a small accuracy cost.
+
+    :param ner_model: fp32 PyTorch model
+    :return: quantized model
+    '''
+    import torch
+
+    ner_model.eval()
+    return torch.quantization.quantize_dynamic(ner_model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_onnx_model(source: str, local_files_only: bool = False):
+    '''
+    Helper function to load the NER model as an ONNX Runtime session
+
+    :param source: model id on the Hugging Face hub, or local directory of the model
+    :param local_files_only: load without network access
+    :return: `optimum` ONNX Runtime token classification model
+    '''
+    try:
+        from optimum.onnxruntime import ORTModelForTokenClassification
+    except ImportError as error:
+        raise ImportError("The onnx backend requires optimum (pip install optimum[onnxruntime])") from error
+
+    # Export the PyTorch model on the fly unless an ONNX model was already saved there
+    export = not (os.path.isdir(source) and any(name.endswith('.onnx') for name in os.listdir(source)))
+    return ORTModelForTokenClassification.from_pretrained(source, export=export, local_files_only=local_files_only)
+
+
+def download_model(model_dir: str, model: str = cs.NER_MODEL, backend: str = cs.NER_BACKEND):
+    '''
+    Helper function to save the NER model from the Hugging Face hub to a
+    local directory, to be loaded offline with `model_dir`
+
+    :param model_dir: directory the model and its tokenizer are saved to
+    :param model: model id on the Hugging Face hub
+    :param backend: with `onnx`, the model is saved already exported to ONNX
+    '''
+    from transformers import AutoTokenizer, AutoModelForTokenClassification
+
+    AutoTokenizer.from_pretrained(model).save_pretrained(model_dir)
+    if backend == 'onnx':
+        load_onnx_model(model).save_pretrained(model_dir)
+    else:
+        AutoModelForTokenClassification.from_pretrained(model).save_pretrained(model_dir)
+
+
+def get_text_windows(text: str, tokenizer, window: int, overlap: int) -> list[tuple[int, int]]:
+    '''
+    Helper function to split a text into overlapping windows of at most
+    `window` tokens
+
+    :param text: text to be split
+    :param tokenizer: tokenizer of the NER model (must return offset mappings)
+    :param window: maximum number of tokens per window
+    :param overlap: number of tokens shared by two consecutive windows
+    :return: list of (start, end) character spans of the windows
+    '''
+    if overlap >= window:
+        raise ValueError("overlap must be smaller than window")
+
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)['offset_mapping']
+
+    if len(offsets) <= window:
+        return [(0, len(text))]
+
+    spans = []
+    start = 0
+    while True:
+        end = min(start + window, len(offsets))
+
+        # Never cut a word in the middle: move the window end back to a word start
+        while end < len(offsets) and end - start > overlap + 1 and offsets[end][0] == offsets[end - 1][1]:
+            end -= 1
+
+        spans.append((offsets[start][0], offsets[end - 1][1]))
+        if end == len(offsets):
+            break
+
+        # Start the next window `overlap` tokens before the end of this one, at a word start
+        next_start = end - overlap
+        while next_start > start + 1 and offsets[next_start][0] == offsets[next_start - 1][1]:
+            next_start -= 1
+        start = next_start
+
+    return spans
+
+
+def merge_window_outputs(spans: list[tuple[int, int]], outputs: list[list[dict]]) -> list[dict]:
+    '''
+    Helper function to merge the token predictions of overlapping windows
+    into the predictions of the whole text
+
+    Offsets are shifted back to the whole text, and every token of an
+    overlap is kept from a single window: the boundary is the middle of
+    the overlap, so each token is taken from the window where it has the
+    most context.
+
+    :param spans: character spans of the windows (see `get_text_windows`)
+    :param outputs: raw token classification output of each window
+    :return: raw token classification output of the whole text
+    '''
+    merged = []
+    for i, ((start, end), output) in enumerate(zip(spans, outputs)):
+        own_start = 0 if i == 0 else (start + spans[i - 1][1]) // 2
+        own_end = float('inf') if i == len(spans) - 1 else (spans[i + 1][0] + end) // 2
+
+        for item in output:
+            item = dict(item, start=item['start'] + start, end=item['end'] + start)
+            if own_start <= item['start'] < own_end:
+                merged.append(item)
+
+    return merged
+
+
+def run_ner(nlp, texts: list[str], window: int = None, overlap: int = 0, batch_size: int = 1) -> list[list[dict]]:
+    '''
+    Wrapper function to run the token classification pipeline over texts,
+    optionally in sliding windows so long texts are not truncated
+
+    :param nlp: `transformers` token classification pipeline
+    :param texts: list of texts
+    :param window: maximum number of tokens per window (None to send whole texts)
+    :param overlap: number of tokens shared by two consecutive windows
+    :param batch_size: number of texts (or windows) per forward pass
+    :return: list of raw token classification outputs, one per text
+    '''
+    if not texts:
+        return []
+
+    if not window:
+        outputs = nlp(texts, batch_size=batch_size)
+        return [list(output) for output in outputs]
+
+    # Split every text into windows and run all windows as one stream of batches
+    text_spans = [get_text_windows(text, nlp.tokenizer, window, overlap) for text in texts]
+    chunks = [text[start:end] for text, spans in zip(texts, text_spans) for start, end in spans]
+    chunk_outputs = iter(nlp(chunks, batch_size=batch_size))
+
+    results = []
+    for spans in text_spans:
+        outputs = [list(next(chunk_outputs)) for _ in spans]
+        results.append(merge_window_outputs(spans, outputs))
+
+    return results
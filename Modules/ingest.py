@@ -0,0 +1,327 @@
+import io
+import os
+import glob
+import json
+import queue
+import tarfile
+import zipfile
+import threading
+
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+_END = object()
+
+
+def _is_resume_file(name: str) -> bool:
+    return name.lower().endswith(RESUME_EXTENSIONS)
+
+
+def _to_memory(data: bytes, name: str) -> io.BytesIO:
+    memory_file = io.BytesIO(data)
+    memory_file.name = name
+    return memory_file
+
+
+def iter_resumes(source: str):
+    '''
+    Generator over the resumes of a source, one at a time
+
+    :param source: directory (searched recursively), glob pattern, ZIP or TAR archive,
+                   JSONL file of texts (`{"id": ..., "text": ...}` per line) or a single PDF/DOCX file
+    :return: iterator of (item id, resume) pairs, the resume being a file path, an in-memory file or a text
+    '''
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if _is_resume_file(name):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path
+
+    elif glob.has_magic(source):
+        for path in sorted(glob.iglob(source, recursive=True)):
+            if _is_resume_file(path) and os.path.isfile(path):
+                yield path, path
+
+    elif source.lower().endswith('.zip'):
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.infolist():
+                if not member.is_dir() and _is_resume_file(member.filename):
+                    yield member.filename, _to_memory(archive.read(member), member.filename)
+
+    elif source.lower().endswith(TAR_EXTENSIONS):
+        # Stream mode: members are read in archive order, without seeking back
+        with tarfile.open(source, 'r|*') as archive:
+            for member in archive:
+                if member.isfile() and _is_resume_file(member.name):
+                    yield member.name, _to_memory(archive.extractfile(member).read(), member.name)
+
+    elif source.lower().endswith('.jsonl'):
+        with open(source, encoding='utf-8') as jsonl_file:
+            for line_number, line in enumerate(jsonl_file, 1):
+                if line.strip():
+                    item = json.loads(line)
+                    yield str(item.get('id', line_number)), item['text']
+
+    elif _is_resume_file(source):
+        yield source, source
+
+    else:
+        raise ValueError(f"Unsupported resumes source: {source}")
+
+
+class Checkpoint(object):
+    '''
+    Append-only file of the ids of the processed items, so an interrupted
+    run can be resumed without parsing the same items again
+    '''
+
+    def __init__(self, path: str):
+        self.__done = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                self.__done = {line.rstrip('\n') for line in checkpoint_file if line.strip()}
+
+        self.__file = open(path, 'a', encoding='utf-8')
+
+    def __contains__(self, item_id: str):
+        return item_id in self.__done
+
+    def add(self, item_id: str):
+        self.__done.add(item_id)
+        self.__file.write(item_id + '\n')
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+
+class JsonlWriter(object):
+    '''
+    Writes every result as one JSON line (`{"id": ..., **details}`), flushed immediately
+    '''
+
+    def __init__(self, path: str):
+        self.__file = open(path, 'a', encoding='utf-8')
+
+    def write(self, item_id: str, details: dict) -> list[str]:
+        '''
+        Writes a result and returns the ids of the results now saved to the file (this one)
+        '''
+        self.__file.write(json.dumps({'id': item_id, **details}) + '\n')
+        self.__file.flush()
+        return [item_id]
+
+    def close(self) -> list[str]:
+        self.__file.close()
+        return []
+
+
+def _part_path(path: str) -> str:
+    # The path itself or its first free part file (`results.1.parquet`, `results.2.parquet`, ...)
+    root, ext = os.path.splitext(path)
+    part = 0
+    while os.path.exists(path):
+        part += 1
+        path = f"{root}.{part}{ext}"
+    return path
+
+
+class ParquetWriter(object):
+    '''
+    Writes the results to a Parquet file in row groups of `row_group_size` rows (needs `pyarrow`)
+
+    List fields are stored as JSON strings, so every row group has the same schema.
+    A Parquet file cannot be appended to: when the output file exists (e.g. a
+    run resumed from its checkpoint), the results go to a new part file next
+    to it (`results.1.parquet`, `results.2.parquet`, ...).
+    '''
+
+    def __init__(self, path: str, row_group_size: int = 1000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ImportError("Writing Parquet files requires pyarrow (pip install pyarrow)") from error
+
+        self.__pyarrow = pyarrow
+        self.__writer = None
+        self.__path = _part_path(path)
+        self.__rows = []
+        self.__row_group_size = row_group_size
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def write(self, item_id: str, details: dict) -> list[str]:
+        '''
+        Buffers a result and returns the ids of the results now saved to the file
+        (the whole row group once it is full, none otherwise)
+        '''
+        row = {'id': item_id}
+        for key, value in details.items():
+            row[key] = None if value is None else json.dumps(value) if isinstance(value, list) else str(value)
+        self.__rows.append(row)
+
+        if len(self.__rows) >= self.__row_group_size:
+            return self.__flush()
+        return []
+
+    def __flush(self) -> list[str]:
+        if not self.__rows:
+            return []
+
+        table = self.__pyarrow.Table.from_pylist(self.__rows, schema=self.__schema())
+        if self.__writer is None:
+            self.__writer = self.__pyarrow.parquet.ParquetWriter(self.__path, table.schema)
+        self.__writer.write_table(table)
+
+        saved = [row['id'] for row in self.__rows]
+        self.__rows = []
+        return saved
+
+    def __schema(self):
+        return self.__pyarrow.schema([(name, self.__pyarrow.string()) for name in self.__rows[0]])
+
+    def close(self) -> list[str]:
+        '''
+        Writes the last row group and closes the file, returns the ids of the results it saved
+        '''
+        saved = self.__flush()
+        if self.__writer is not None:
+            self.__writer.close()
+        return saved
+
+
+def open_writer(path: str):
+    '''
+    Helper function to open the results writer matching the output file extension (.jsonl or .parquet)
+    '''
+    if path.lower().endswith('.parquet'):
+        return ParquetWriter(path)
+    if path.lower().endswith('.jsonl'):
+        return JsonlWriter(path)
+
+    raise ValueError(f"Unsupported output format: {path}")
+
+
+def stream_parse(parser, source: str, output: str = None, checkpoint: str = None,
+                 prefetch: int = 4, batch_size: int = 1, skip_errors: bool = False):
+    '''
+    Parses every resume of a source with constant memory
+
+    A background thread reads and extracts the text of the next resumes
+    (at most `prefetch` of them wait in memory) while the current ones go
+    through the NER model, `batch_size` resumes at a time.
+
+    :param parser: `ResumeParser` to be used
+    :param source: resumes source (see `iter_resumes`)
+    :param output: optional .jsonl or .parquet file the results are appended to
+    :param checkpoint: optional checkpoint file: items listed there are skipped, processed items are added
+                       once their results are saved to the output file (e.g. once their Parquet row group is written)
+    :param prefetch: maximum number of loaded resumes waiting for the model
+    :param batch_size: maximum number of resumes sent to the model at once
+    :param skip_errors: skip the resumes that cannot be parsed (they are not checkpointed) instead of raising
+    :return: iterator of (item id, extracted details) pairs
+    '''
+    done = Checkpoint(checkpoint) if checkpoint else None
+    writer = open_writer(output) if output else None
+
+    loaded = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item_id, resume in iter_resumes(source):
+                if stop.is_set():
+                    break
+                if done is not None and item_id in done:
+                    continue
+
+                try:
+                    resume, key, details = parser._lookup(resume)
+                    document = parser._load(resume) if details is None else None
+                    loaded.put((item_id, key, details, document, None))
+                except Exception as error:
+                    loaded.put((item_id, None, None, None, error))
+        except Exception as error:
+            loaded.put((None, None, None, None, error))
+        finally:
+            loaded.put(_END)
+
+    producer = threading.Thread(target=produce, name='resume-prefetch', daemon=True)
+    producer.start()
+
+    try:
+        finished = False
+        while not finished:
+            # Wait for one resume, then take the ones already loaded (up to `batch_size`)
+            batch = [loaded.get()]
+            while len(batch) < batch_size and batch[-1] is not _END:
+                try:
+                    batch.append(loaded.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch[-1] is _END:
+                batch.pop()
+                finished = True
+
+            items = []
+            for item_id, key, details, document, error in batch:
+                if error is not None:
+                    if not skip_errors or item_id is None:
+                        raise error
+                    continue
+                items.append([item_id, key, details, document])
+
+            # A batch of cached results does not need the model (nor loads it)
+            to_infer = [item for item in items if item[2] is None]
+            outputs = []
+            if to_infer:
+                try:
+                    outputs = parser._run_ner([item[3][2] for item in to_infer], len(to_infer))
+                except Exception:
+                    if not skip_errors:
+                        raise
+                    to_infer = []
+            for item, pretrained_output in zip(to_infer, outputs):
+                resume, ext, text = item[3]
+                try:
+                    item[2] = parser._analyze(resume, ext, text, pretrained_output)
+                    parser._store(item[1], item[2])
+                except Exception:
+                    if not skip_errors:
+                        raise
+                item[3] = None
+
+            for item_id, _, details, _ in items:
+                if details is None:
+                    continue
+
+                # Only the results saved to the output file are checkpointed
+                saved = writer.write(item_id, details) if writer is not None else [item_id]
+                if done is not None:
+                    for saved_id in saved:
+                        done.add(saved_id)
+                yield item_id, details
+
+    finally:
+        # Unblock and stop the producer, then release the files
+        stop.set()
+        while producer.is_alive():
+            try:
+                loaded.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+        if writer is not None:
+            saved = writer.close()
+            if done is not None:
+                for saved_id in saved:
+                    done.add(saved_id)
+        if done is not None:
+            done.close()
@@ -0,0 +1,269 @@
+from bisect import bisect_left
+from collections import deque
+
+from .constants import SKILL_TOKEN_REGEX, SKILL_MAX_TOKENS, SKILL_PREFIX_LENGTH, WORD_BOUNDARY_REGEX
+
+
+def is_word_boundary(text: str, index: int) -> bool:
+    '''
+    Helper function to check for a regex `\\b` boundary at `index` of `text`
+    '''
+    left = index > 0 and (text[index - 1].isalnum() or text[index - 1] == '_')
+    right = index < len(text) and (text[index].isalnum() or text[index] == '_')
+    return left != right
+
+
+class AhoCorasick(object):
+    '''
+    Multi-pattern string matcher (Aho-Corasick automaton).
+
+    The automaton is built once from the dictionary, then every occurrence
+    of every pattern is found in a single pass over the text, whatever the
+    size of the dictionary.
+    '''
+
+    def __init__(self, patterns):
+        self.__goto = [{}]
+        self.__fail = [0]
+        self.__output = [()]
+
+        for pattern in patterns:
+            if isinstance(pattern, str) and pattern:
+                self.__add(pattern)
+
+        self.__build_failure_links()
+
+    def __add(self, pattern: str):
+        state = 0
+        for char in pattern:
+            if char not in self.__goto[state]:
+                self.__goto.append({})
+                self.__fail.append(0)
+                self.__output.append(())
+                self.__goto[state][char] = len(self.__goto) - 1
+            state = self.__goto[state][char]
+
+        if pattern not in self.__output[state]:
+            self.__output[state] += (pattern,)
+
+    def __build_failure_links(self):
+        queue = deque(self.__goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.__goto[state].items():
+                queue.append(next_state)
+
+                fail = self.__fail[state]
+                while fail and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                self.__fail[next_state] = self.__goto[fail].get(char, 0)
+
+                # A state also outputs every pattern that is a suffix of its own
+                self.__output[next_state] += self.__output[self.__fail[next_state]]
+
+    def __len__(self):
+        return len(self.__goto)
+
+    def finditer(self, text: str):
+        '''
+        Yields (start, end, pattern) for every occurrence of a pattern in `text`
+        (overlapping occurrences included)
+        '''
+        goto, fail, output = self.__goto, self.__fail, self.__output
+        state = 0
+
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for pattern in output[state]:
+                yield index + 1 - len(pattern), index + 1, pattern
+
+    def find_words(self, text: str) -> list[str]:
+        '''
+        Returns the patterns found in `text` as whole words (the same rule as
+        `\\bpattern\\b`), in order of first occurrence
+        '''
+        found = {}
+        for start, end, pattern in self.finditer(text):
+            if pattern not in found and is_word_boundary(text, start) and is_word_boundary(text, end):
+                found[pattern] = None
+
+        return list(found)
+
+
+class TrieWordMatcher(object):
+    '''
+    Whole-word dictionary matcher over a `marisa_trie.Trie`.
+
+    The trie is only queried at the word boundaries of the text: every
+    pattern starting there is found by one prefix search, and kept when it
+    also ends on a word boundary. The results are the same as
+    `AhoCorasick.find_words`, without building an automaton in memory.
+    '''
+
+    def __init__(self, trie):
+        self.__trie = trie
+        self.__max_length = max(map(len, trie.iterkeys()), default=0)
+        self.__first_chars = {pattern[0] for pattern in trie.iterkeys()}
+
+    def find_words(self, text: str) -> list[str]:
+        '''
+        Returns the patterns found in `text` as whole words (the same rule as
+        `\\bpattern\\b`), in order of first occurrence
+        '''
+        prefixes, max_length, first_chars = self.__trie.prefixes, self.__max_length, self.__first_chars
+        boundaries = {match.start() for match in WORD_BOUNDARY_REGEX.finditer(text)}
+
+        # Occurrences by end position, the longest first (the order of `AhoCorasick.finditer`)
+        occurrences = []
+        for start in boundaries:
+            if start == len(text) or text[start] not in first_chars:
+                continue
+
+            for pattern in prefixes(text[start:start + max_length]):
+                if start + len(pattern) in boundaries:
+                    occurrences.append((start + len(pattern), -len(pattern), pattern))
+
+        return list(dict.fromkeys(pattern for _, _, pattern in sorted(occurrences)))
+
+
+class SkillIndex(object):
+    '''
+    Longest-match skill finder over the no-space form used by `skills.csv`.
+
+    The text is split into word and punctuation tokens, then, starting at
+    every word, consecutive tokens of the same line are concatenated
+    (lower-cased, without spaces) and looked up in the skill set. An
+    n-gram is only extended while it is still the prefix of a skill, the
+    longest n-gram found is kept and the scan resumes after it, so the
+    whole text is matched in one linear pass.
+    '''
+
+    def __init__(self, skill_set, max_tokens: int = SKILL_MAX_TOKENS):
+        self.__skill_set = skill_set
+        self.__max_tokens = max_tokens
+
+        # Short prefixes are answered by a set, longer ones by a binary search
+        self.__prefixes = {skill[:k] for skill in skill_set for k in range(1, SKILL_PREFIX_LENGTH + 1)}
+        self.__sorted_skills = sorted(skill_set)
+
+    def __contains__(self, skill: str):
+        return skill in self.__skill_set
+
+    def has_prefix(self, prefix: str) -> bool:
+        '''
+        Checks whether `prefix` starts at least one skill
+        '''
+        if len(prefix) <= SKILL_PREFIX_LENGTH or prefix[:SKILL_PREFIX_LENGTH] not in self.__prefixes:
+            return prefix in self.__prefixes
+
+        index = bisect_left(self.__sorted_skills, prefix)
+        return index < len(self.__sorted_skills) and self.__sorted_skills[index].startswith(prefix)
+
+    def find(self, text: str) -> list[str]:
+        '''
+        Returns the skills found in `text` as they are written in the text
+        (lower-cased), in order of occurrence
+        '''
+        skill_set, has_prefix = self.__skill_set, self.has_prefix
+        tokens = SKILL_TOKEN_REGEX.findall(text.lower())  # (leading spaces, token) pairs
+        count = len(tokens)
+
+        skills = []
+        i = 0
+        while i < count:
+            key = tokens[i][1]
+            if not (key[0].isalnum() or key[0] == '_'):
+                i += 1
+                continue
+
+            longest = i if key in skill_set else None
+            if longest is None and not has_prefix(key):
+                i += 1
+                continue
+
+            # Extend the n-gram while it can still lead to a skill
+            for j in range(i + 1, min(i + self.__max_tokens, count)):
+                token = tokens[j][1]
+                if token == '\n':
+                    break
+
+                key += token
+                if key in skill_set:
+                    longest = j
+                elif not has_prefix(key):
+                    break
+
+            if longest is None:
+                i += 1
+            else:
+                skills.append(tokens[i][1] + ''.join(space + token for space, token in tokens[i + 1:longest + 1]))
+                i = longest + 1
+
+        return skills
+
+
+class TrieSkillIndex(object):
+    '''
+    Longest-match skill finder over a `marisa_trie.Trie` of the skills
+    (same results as `SkillIndex`).
+
+    Starting at every word, the tokens of the same line are concatenated
+    up to `max_tokens` of them, and a single prefix search of the trie
+    returns every skill starting there. The longest one ending on a token
+    boundary is kept and the scan resumes after it. The trie replaces the
+    skill set and its prefix set, so nothing is built in memory.
+    '''
+
+    def __init__(self, trie, max_tokens: int = SKILL_MAX_TOKENS):
+        self.__trie = trie
+        self.__max_tokens = max_tokens
+
+    def __contains__(self, skill: str):
+        return skill in self.__trie
+
+    def has_prefix(self, prefix: str) -> bool:
+        '''
+        Checks whether `prefix` starts at least one skill
+        '''
+        return next(self.__trie.iterkeys(prefix), None) is not None
+
+    def find(self, text: str) -> list[str]:
+        '''
+        Returns the skills found in `text` as they are written in the text
+        (lower-cased), in order of occurrence
+        '''
+        prefixes = self.__trie.prefixes
+        tokens = SKILL_TOKEN_REGEX.findall(text.lower())  # (leading spaces, token) pairs
+        count = len(tokens)
+
+        skills = []
+        i = 0
+        while i < count:
+            key = tokens[i][1]
+            if not (key[0].isalnum() or key[0] == '_'):
+                i += 1
+                continue
+
+            # Index of the last token of each n-gram, by length of the n-gram
+            ends = {len(key): i}
+            for j in range(i + 1, min(i + self.__max_tokens, count)):
+                token = tokens[j][1]
+                if token == '\n':
+                    break
+
+                key += token
+                ends[len(key)] = j
+
+            lengths = [len(skill) for skill in prefixes(key) if len(skill) in ends]
+            if not lengths:
+                i += 1
+            else:
+                longest = ends[max(lengths)]
+                skills.append(tokens[i][1] + ''.join(space + token for space, token in tokens[i + 1:longest + 1]))
+                i = longest + 1
+
+        return skills
@@ -0,0 +1,65 @@
+import gc
+import os
+import threading
+
+from . import constants as cs
+
+
+def get_rss() -> int:
+    '''
+    Helper function to get the resident set size of the current process
+
+    :return: RSS in bytes, or None where /proc is not available
+    '''
+    try:
+        with open('/proc/self/statm', 'rb') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryManager(object):
+    '''
+    Bounded garbage collection strategy of the parser.
+
+    A full `gc.collect()` after every document stalls every thread of the
+    process and costs more than parsing a short resume. Document buffers
+    are released by reference counting as soon as a parse ends, so the
+    cyclic collector only has to run now and then: every `collect_every`
+    parses, or when the RSS goes above `rss_watermark` bytes (checked at
+    most once every `watermark_interval` parses, so a process that stays
+    above the watermark does not collect on every parse).
+    '''
+
+    def __init__(self,
+                 collect_every: int = cs.GC_COLLECT_EVERY,
+                 rss_watermark: int = cs.GC_RSS_WATERMARK,
+                 watermark_interval: int = cs.GC_WATERMARK_INTERVAL):
+        self.__collect_every = collect_every
+        self.__rss_watermark = rss_watermark
+        self.__watermark_interval = max(1, watermark_interval)
+
+        self.__lock = threading.Lock()
+        self.__parses = 0
+        self.__last_collection = 0
+        self.collections = 0
+
+    def after_parse(self):
+        '''
+        Counts a finished parse and collects garbage when a threshold is reached
+        '''
+        with self.__lock:
+            self.__parses += 1
+            since_collection = self.__parses - self.__last_collection
+
+            collect = bool(self.__collect_every) and since_collection >= self.__collect_every
+            if not collect and self.__rss_watermark and since_collection >= self.__watermark_interval:
+                rss = get_rss()
+                collect = rss is not None and rss > self.__rss_watermark
+
+            if collect:
+                self.__last_collection = self.__parses
+                self.collections += 1
+
+        if collect:
+            gc.collect()
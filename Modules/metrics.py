@@ -0,0 +1,100 @@
+import threading
+from collections import defaultdict
+
+
+class ParseHook(object):
+    '''
+    Base class of the parse hooks given to `ResumeParser(hooks=[...])`.
+
+    Every method is a no-op, subclasses override the events they need.
+    Hooks are called from the parsing thread, so they must be fast and
+    thread-safe when the parser is shared between threads.
+    '''
+
+    def on_stage(self, stage: str, seconds: float):
+        '''
+        Called when a stage of a parse ends (`load`, `ner`, `skills`, ...)
+        '''
+
+    def on_counter(self, counter: str, value: int):
+        '''
+        Called with the size of a parsed resume (`chars`, `tokens`, `entities`, ...)
+        '''
+
+    def on_path(self, field: str, path: str):
+        '''
+        Called with the extraction path used for a field
+        (e.g. `skills`: `ner`, `skills_section` or `skill_index`)
+        '''
+
+
+class CallbackHook(ParseHook):
+    '''
+    Parse hook forwarding every event to a single callback
+    `callback(event, name, value)`, `event` being `stage`, `counter` or `path`
+    '''
+
+    def __init__(self, callback):
+        self.__callback = callback
+
+    def on_stage(self, stage: str, seconds: float):
+        self.__callback('stage', stage, seconds)
+
+    def on_counter(self, counter: str, value: int):
+        self.__callback('counter', counter, value)
+
+    def on_path(self, field: str, path: str):
+        self.__callback('path', field, path)
+
+
+class PrometheusExporter(ParseHook):
+    '''
+    Parse hook aggregating the events into Prometheus metrics, rendered
+    in the Prometheus text exposition format by `render`
+    '''
+
+    def __init__(self, prefix: str = 'resume_parser'):
+        self.__prefix = prefix
+        self.__lock = threading.Lock()
+        self.__stage_seconds = defaultdict(float)
+        self.__stage_count = defaultdict(int)
+        self.__counters = defaultdict(int)
+        self.__paths = defaultdict(int)
+
+    def on_stage(self, stage: str, seconds: float):
+        with self.__lock:
+            self.__stage_seconds[stage] += seconds
+            self.__stage_count[stage] += 1
+
+    def on_counter(self, counter: str, value: int):
+        with self.__lock:
+            self.__counters[counter] += value
+
+    def on_path(self, field: str, path: str):
+        with self.__lock:
+            self.__paths[(field, path)] += 1
+
+    def render(self) -> str:
+        '''
+        Returns the metrics in the Prometheus text exposition format
+        '''
+        prefix = self.__prefix
+        lines = []
+
+        with self.__lock:
+            lines.append(f"# HELP {prefix}_stage_seconds Time spent in each parsing stage.")
+            lines.append(f"# TYPE {prefix}_stage_seconds summary")
+            for stage in sorted(self.__stage_seconds):
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {self.__stage_seconds[stage]:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {self.__stage_count[stage]}')
+
+            for counter in sorted(self.__counters):
+                lines.append(f"# TYPE {prefix}_{counter}_total counter")
+                lines.append(f"{prefix}_{counter}_total {self.__counters[counter]}")
+
+            lines.append(f"# HELP {prefix}_path_total Extraction path used for each field.")
+            lines.append(f"# TYPE {prefix}_path_total counter")
+            for field, path in sorted(self.__paths):
+                lines.append(f'{prefix}_path_total{{field="{field}",path="{path}"}} {self.__paths[(field, path)]}')
+
+        return '\n'.join(lines) + '\n'
@@ -1,64 +1,184 @@
 import os
 import io
-import gc
-import pandas as pd
+import itertools
+import time
+import threading
 
 from . import extractors
 from . import accumolators
 from . import utils
+from . import inference
+from . import dictionaries
 from . import constants as cs
-
-from transformers import pipeline
+from .document import ResumeDocument, TextDocument
+from .cache import hash_bytes, hash_file
+from .memory import MemoryManager
 
 class ResumeParser(object):
 
     def __init__(self,
                  skills_file= cs.workspace_dir +'/Data/skills.csv',
                  companies_file= cs.workspace_dir +'/Data/companies.csv',
-                 custom_mobile_regex= None):
+                 custom_mobile_regex= None,
+                 ner_window= cs.NER_WINDOW,
+                 ner_overlap= cs.NER_OVERLAP,
+                 cache= None,
+                 model= cs.NER_MODEL,
+                 model_dir= None,
+                 lazy= True,
+                 hooks= None,
+                 memory_manager= None,
+                 merge_experience= False,
+                 ner_backend= cs.NER_BACKEND,
+                 max_pages= None,
+                 max_chars= None,
+                 page_workers= 0,
+                 dedup= None):
+        
+        if ner_backend not in cs.NER_BACKENDS:
+            raise ValueError(f"Unsupported NER backend: {ner_backend}")
         
-        # Load NLP Models
-        self.__pretrained_nlp = pipeline("token-classification", "reyhanemyr/bert-base-NER-finetuned-cv")
+        # NLP Model (loaded on first use, or by `warmup`)
+        self.__model = model
+        self.__model_dir = model_dir
+        self.__ner_backend = ner_backend
+        self.__pretrained_nlp = None
         
         # Define basic attributes
         self.__custom_mobile_regex = custom_mobile_regex
-        self.__skill_set = set(pd.read_csv(skills_file)['Skill'])
-        self.__company_set = set(pd.read_csv(companies_file)['Company'])
-        self.reset()
+        self.__ner_window = ner_window
+        self.__ner_overlap = ner_overlap
+        self.__merge_experience = merge_experience
+        
+        # Document budgets (only the first pages/characters are read) and PDF page workers
+        self.__max_pages = max_pages
+        self.__max_chars = max_chars
+        self.__page_workers = page_workers
+        
+        # Skills and companies (memory-mapped compact dictionaries when they are built, CSV files otherwise)
+        self.__skill_set = dictionaries.load_dictionary(skills_file, 'Skill')
+        self.__company_set = dictionaries.load_dictionary(companies_file, 'Company')
+        self.__skill_index = dictionaries.get_skill_index(self.__skill_set)
+        self.__company_matcher = dictionaries.get_company_matcher(self.__company_set)
+        
+        # Results cache (keyed on the resume bytes and on everything that changes the results,
+        # the near-duplicate index included: the NER output of a near duplicate may differ)
+        self.__cache = cache
+        if cache is not None:
+            self.__config_key = hash_bytes(hash_file(skills_file), hash_file(companies_file),
+                                           str(custom_mobile_regex), model_dir or model, str(ner_window), str(ner_overlap),
+                                           str(merge_experience), ner_backend, str(max_pages), str(max_chars),
+                                           str(dedup is not None))
+        
+        # Near-duplicate index (see `dedup.NearDuplicateIndex`): the NER output of an edited copy of a resume
+        # already parsed by the same model is reused, the other extractors run on the new text
+        self.__dedup = dedup
+        if dedup is not None:
+            self.__dedup_namespace = hash_bytes(model_dir or model, ner_backend, str(ner_window), str(ner_overlap))
+        
+        # Garbage collection strategy (periodic or by RSS watermark, instead of after every parse)
+        self.__memory = memory_manager if memory_manager is not None else MemoryManager()
+        
+        # Profiling hooks (see `metrics.ParseHook`), skipped entirely when there are none
+        self.__hooks = list(hooks) if hooks else []
+        
+        # Per-call state lives in local variables, only the last result of each thread is kept.
+        # The NER model (and its tokenizer) is shared, so calls to it are serialized.
+        self.__local = threading.local()
+        self.__ner_lock = threading.Lock()
+        
+        if not lazy:
+            self.warmup()
+    
+    def warmup(self):
+        """
+        Loads the NER model now instead of on the first parse
+        """
+        with self.__ner_lock:
+            self.__load_model()
+    
+    def _reopen(self):
+        """
+        Reopens the databases of the results cache and near-duplicate index (if any)
+        in a forked process, which must not use the SQLite connections of its parent
+        """
+        if self.__cache is not None:
+            self.__cache.reopen()
+        if self.__dedup is not None:
+            self.__dedup.reopen()
+    
+    def __load_model(self):
+        # Must be called with the NER lock held
+        if self.__pretrained_nlp is None:
+            self.__pretrained_nlp = inference.load_ner_pipeline(self.__model, self.__model_dir, self.__ner_backend)
     
     def get_extracted_data(self):
         """
-        Returns the extracted details from the resume
+        Returns the details extracted from the last resume parsed by the calling thread
         """
-        return self.__details
+        if not hasattr(self.__local, 'details'):
+            self.reset()
+        
+        return self.__local.details
     
     def reset(self):
         """
-        Resets the __details dictionary to its initial state
+        Resets the calling thread's extracted details to their initial state
         """
-        self.__details = {
-            'name': None,
-            'email': None,
-            'mobile_numbers': None,
-            'role': None,
-            'locations': None,
-            'skills': None,
-            'college': None,
-            'degree': None,
-            'companies': None,
-            'experience': None,
-            'links': None,
-            'no_of_pages': None,
-            'format': None
-        }
+        self.__local.details = self.__new_details()
     
+    @staticmethod
+    def __new_details(fields=None):
+        """
+        Returns a new details dictionary with every attribute (or the given fields only) set to None
+        """
+        return dict.fromkeys(fields or cs.FIELDS)
+    
+    @staticmethod
+    def __check_fields(fields, tier):
+        """
+        Validates the requested fields and extraction tier, and returns the fields as a tuple (None for all fields)
+        """
+        if tier not in cs.TIERS:
+            raise ValueError(f"Unsupported extraction tier: {tier}")
+        if fields is None:
+            return None
+        
+        fields = tuple(dict.fromkeys(fields))
+        unknown = [field for field in fields if field not in cs.FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"Unknown fields: {unknown}" if unknown else "No fields requested")
+        
+        return fields
+    
+    @staticmethod
+    def __missing_model_fields(details, fields):
+        """
+        Returns the given fields among those the NER model fills that the dictionaries and regexes left empty
+        (an `Unknown` degree included)
+        """
+        model_fields = [field for field in cs.NER_FIELDS + cs.FALLBACK_FIELDS if field in fields]
+        return [field for field in model_fields
+                if not details[field] or (field == 'degree' and details[field] == 'Unknown')]
     
-    def parse(self, resume):
+    @staticmethod
+    def __needs_ner(fields, tier):
+        """
+        Tells whether the NER model must run before the other extractors (it may still run later in the fast tier)
+        """
+        return tier == 'full' or bool(set(fields or cs.FIELDS) & set(cs.NER_FIELDS))
+    
+    
+    def parse(self, resume, fields=None, tier='full'):
         """
         Parses the given resume to extract various details such as name, email, mobile number, skills, academic degree,
         companies worked at, and experience.
         Args:
             resume (str or io.BytesIO): The resume file path or file-like object containing the resume data.
+            fields (list): Fields to extract (see `constants.FIELDS`), all of them by default. Only the extractors
+                these fields need are run, and only these fields are returned.
+            tier (str): `full` runs the NER model for every resume. `fast` runs it only when a requested field
+                needs it (name, role, locations) or is left empty by the dictionaries and regexes.
         Returns:
             dict: A dictionary containing the extracted resume details.
                 - name (str): The name of the candidate.
@@ -70,129 +190,443 @@ class ResumeParser(object):
                 - companies (list): A list of companies the candidate mentioned in the resume.
                 - experience (float): Total experience in years.
         """
-        self.reset()
+        fields = self.__check_fields(fields, tier)
+        
+        if self.__hooks:
+            start = time.perf_counter()
+        
+        resume, key, details = self._lookup(resume, fields, tier)
+        
+        if details is None:
+            resume, ext, text = self._load(resume)
+            pretrained_output = self._run_ner([text])[0] if self.__needs_ner(fields, tier) else None
+            
+            details = self._analyze(resume, ext, text, pretrained_output, fields)
+            self._store(key, details)
+        
+        self.__local.details = details
+        
+        if self.__hooks:
+            self.__stage('parse', start)
+        
+        return details
+    
+    def parse_many(self, resumes, batch_size=8, fields=None, tier='full'):
+        """
+        Parses several resumes, running the NER model over each batch of texts in a single call.
+        Text extraction and the regex/dictionary stages still run per resume.
+        Args:
+            resumes (iterable): Resume file paths, file-like objects or texts (same inputs as `parse`).
+            batch_size (int): Number of resumes sent to the NER model at once.
+            fields (list): Fields to extract, all of them by default (see `parse`).
+            tier (str): Extraction tier, `full` or `fast` (see `parse`).
+        Returns:
+            list: The extracted details of every resume, in the input order.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        
+        fields = self.__check_fields(fields, tier)
+        needs_ner = self.__needs_ner(fields, tier)
+        
+        results = []
+        resumes = iter(resumes)
+        
+        while True:
+            batch = [self._lookup(resume, fields, tier) for resume in itertools.islice(resumes, batch_size)]
+            if not batch:
+                break
+            
+            # Only the resumes missing from the cache go through the model
+            loaded = [(i, self._load(resume)) for i, (resume, _, details) in enumerate(batch) if details is None]
+            if needs_ner:
+                pretrained_outputs = self._run_ner([text for _, (_, _, text) in loaded], batch_size)
+            else:
+                pretrained_outputs = [None] * len(loaded)
+            
+            analyzed = []
+            for (i, (resume, ext, text)), pretrained_output in zip(loaded, pretrained_outputs):
+                details = self._analyze(resume, ext, text, pretrained_output, fields, escalate=False)
+                batch[i] = (resume, batch[i][1], details)
+                analyzed.append((i, text, details))
+            
+            # Fast tier: the resumes whose dictionaries and regexes left a field empty go through the model together
+            escalated = [(text, details) for _, text, details in analyzed
+                         if not needs_ner and self.__missing_model_fields(details, fields or cs.FIELDS)]
+            if escalated:
+                pretrained_outputs = self._run_ner([text for text, _ in escalated], batch_size)
+                for (text, details), pretrained_output in zip(escalated, pretrained_outputs):
+                    self._escalate(text, details, pretrained_output, fields)
+            
+            for i, _, details in analyzed:
+                self._store(batch[i][1], details)
+            
+            results.extend(details for _, _, details in batch)
+        
+        return results
+    
+    def _lookup(self, resume, fields=None, tier='full'):
+        """
+        Looks the resume up in the results cache (if any). Resume files are loaded to the memory to be hashed.
+        A selection of fields of the full tier is also served from the cached details of the whole resume.
+        Returns:
+            tuple: The resume, its cache key (None without cache) and its cached details (None if missing).
+        """
+        if self.__cache is None:
+            return resume, None, None
+        
+        if isinstance(resume, io.BytesIO):
+            key = hash_bytes(self.__config_key, os.path.splitext(resume.name)[1].lower(), resume.getvalue())
+        elif isinstance(resume, str) and resume.lower().endswith(('.docx', '.pdf')):
+            resume = utils.load_to_memory(resume)
+            key = hash_bytes(self.__config_key, os.path.splitext(resume.name)[1].lower(), resume.getvalue())
+        elif isinstance(resume, str):
+            key = hash_bytes(self.__config_key, '', resume)
+        else:
+            raise ValueError("Invalid resume data")
+        
+        details = None
+        if fields is not None or tier != 'full':
+            full_key = key
+            key = hash_bytes(key, tier, ','.join(fields or cs.FIELDS))
+            
+            full_details = self.__cache.get(full_key) if tier == 'full' else None
+            if full_details is not None:
+                details = {field: full_details[field] for field in fields}
+        
+        if details is None:
+            details = self.__cache.get(key)
+        
+        if self.__hooks:
+            self.__path('cache', 'miss' if details is None else 'hit')
+        
+        return resume, key, details
+    
+    def _store(self, key, details):
+        """
+        Stores the extracted details in the results cache (if any).
+        """
+        if key is not None:
+            self.__cache.set(key, details)
+    
+    def _run_ner(self, texts, batch_size=1):
+        """
+        Runs the NER model over the given texts. Long texts are split into overlapping windows of
+        `ner_window` tokens (unless it is None) so entities past the model's 512 tokens limit are not lost.
+        With a near-duplicate index, the outputs of the near duplicates are reused and the model only runs
+        over the other texts (their outputs are then added to the index).
+        """
+        if self.__dedup is None:
+            return self.__infer(texts, batch_size)
+        
+        if self.__hooks:
+            start = time.perf_counter()
+        
+        dedup, namespace = self.__dedup, self.__dedup_namespace
+        signatures = [dedup.signature(text) for text in texts]
+        outputs = []
+        for signature, text in zip(signatures, texts):
+            match = dedup.lookup(signature, text, namespace)
+            outputs.append(None if match is None else match[0])
+        
+        if self.__hooks:
+            self.__stage('dedup', start)
+            for output in outputs:
+                self.__path('dedup', 'miss' if output is None else 'hit')
+        
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if missing:
+            for i, output in zip(missing, self.__infer([texts[i] for i in missing], batch_size)):
+                outputs[i] = output
+                dedup.add(signatures[i], output, namespace)
+        
+        return outputs
+    
+    def __infer(self, texts, batch_size):
+        with self.__ner_lock:
+            self.__load_model()
+            
+            if self.__hooks:
+                start = time.perf_counter()
+            
+            outputs = inference.run_ner(self.__pretrained_nlp, texts, self.__ner_window, self.__ner_overlap, batch_size)
+        
+        if self.__hooks:
+            self.__stage('ner', start)
+            self.__count('ner_texts', len(texts))
+        
+        return outputs
+    
+    def _load(self, resume):
+        """
+        Loads the resume and extracts its text.
+        Returns:
+            tuple: The loaded resume (`ResumeDocument` or text), its extension (None for plain text) and the extracted text.
+        """
+        if self.__hooks:
+            start = time.perf_counter()
         
-        # Define the type of resume data
+        owned_buffer = None
+        
+        # Define the type of resume data (the extension in any case, e.g. `CV.PDF`)
         if isinstance(resume, io.BytesIO):
-            ext = resume.name.split('.')[1]
-        elif '.docx' == resume[-5:] or '.pdf' == resume[-4:]:
-            ext = os.path.splitext(resume)[1].split('.')[1]
+            ext = os.path.splitext(resume.name)[1].split('.')[1].lower()
+        elif resume.lower().endswith(('.docx', '.pdf')):
+            ext = os.path.splitext(resume)[1].split('.')[1].lower()
             
             # Load the file to the memory
             resume = utils.load_to_memory(resume)
+            owned_buffer = resume
         else:
             if isinstance(resume, str):
                 ext = None
             else:
                 raise ValueError("Invalid resume data")
         
+        # Load the resume file once (text, hyperlinks and page count)
+        if ext:
+            resume = ResumeDocument(resume, ext, self.__max_pages, self.__max_chars, self.__page_workers)
+        
+        # The file bytes are not needed anymore once the document is loaded
+        if owned_buffer is not None:
+            owned_buffer.close()
+        
         # Extract text from resume
-        self.__text_raw = extractors.extract_text(resume, ext).strip()
-        self.__text_raw = utils.encode_text(self.__text_raw)
+        text = extractors.extract_text(resume, ext).strip()
+        text = utils.encode_text(text)
+        
+        if self.__hooks:
+            self.__stage('load', start)
+        
+        return resume, ext, text
+    
+    def _analyze(self, resume, ext, text, pretrained_output, fields=None, escalate=True):
+        """
+        Runs the extraction stages over a loaded resume and the raw output of the NER model.
+        Only the stages the given fields need are run (all of them by default). Without NER output (fast tier),
+        the fields the model can fill are taken from the dictionaries and regexes, and the NER model only runs
+        if one of them is left empty (unless `escalate` is False: the caller then runs it, see `_escalate`).
+        """
+        wanted = set(fields or cs.FIELDS)
+        details = self.__new_details(fields)
+        document = TextDocument(text)
+        hooks = self.__hooks
+        start = None
+        if hooks:
+            start = time.perf_counter()
+            self.__count('chars', len(text))
+            self.__count('tokens', len(text.split()))
         
         #----------------------------------#
         # Extract resume details (Parsing) #
         #----------------------------------#
         
         # Extract Email
-        email = extractors.extract_email(self.__text_raw)
-        self.__details['email'] = email
+        if 'email' in wanted:
+            email = extractors.extract_email(text)
+            details['email'] = email
 
         # Extract Mobile Number
-        mobile = extractors.extract_mobile_numbers(self.__text_raw, self.__custom_mobile_regex)
-        self.__details['mobile_numbers'] = mobile
+        if 'mobile_numbers' in wanted:
+            mobile = extractors.extract_mobile_numbers(text, self.__custom_mobile_regex)
+            details['mobile_numbers'] = mobile
 
         
         # Extract Links
-        text_links = extractors.extract_links_from_text(self.__text_raw)
-        hyper_links = extractors.extract_hyperlinks(resume, ext)
-        links = list(text_links | hyper_links)
+        if 'links' in wanted:
+            text_links = extractors.extract_links_from_text(text)
+            hyper_links = extractors.extract_hyperlinks(resume, ext) if ext else set()
+            links = list(text_links | hyper_links)
+            
+            if links:
+                details['links'] = links
         
-        if links:
-            self.__details['links'] = links
+        if hooks:
+            start = self.__stage('regexes', start)
         
-        # Model Outputs
-        pretrained_output = self.__pretrained_nlp(self.__text_raw)
-        pretrained_output = utils.preprocess_bert_output(pretrained_output)
+        # Find the sections (offsets of the text, see `TextDocument`)
+        sections = document.sections if wanted & {'skills', 'experience'} else {}
         
-        # Extract entities
-        cust_ent = extractors.extract_entities_wih_custom_model(pretrained_output)
-        entities = extractors.extract_entity_sections(self.__text_raw)
+        if hooks:
+            start = self.__stage('sections', start)
         
-        # Extract Skills
-        skills = [ent['text'] for ent in pretrained_output if ent['entity'] == 'SKILL']
-
-        valid_skills = {skill for skill in skills if utils.preprocess_skill(skill) in self.__skill_set}
+        # Fields filled by the NER model (or by the dictionaries and regexes in the fast tier)
+        model_fields = [field for field in cs.NER_FIELDS + cs.FALLBACK_FIELDS if field in wanted]
+        if model_fields:
+            start = self.__extract_model_fields(details, document, sections, pretrained_output, model_fields, start)
+            
+            if pretrained_output is None:
+                missing = self.__missing_model_fields(details, model_fields)
+                if missing and escalate:
+                    pretrained_output = self._run_ner([text])[0]
+                    if hooks:
+                        start = time.perf_counter()
+                    start = self.__extract_model_fields(details, document, sections, pretrained_output, missing, start)
+                if hooks and (escalate or not missing):
+                    self.__path('ner', 'escalated' if missing else 'skipped')
+        
+        # Calculate Total Experience
+        if 'experience' in wanted:
+            if 'experience' in sections:
+                # Get Experience in Months
+                total_exp = accumolators.get_total_experience(document.section_lines('experience'), self.__merge_experience)
+                
+                # Calculate Experience in Years
+                details['experience'] = round(total_exp / 12, 2) if total_exp else 0
+            else:
+                details['experience'] = 0
+        
+        if ext:
+            if 'format' in wanted:
+                details['format'] = ext
+            if 'no_of_pages' in wanted:
+                details['no_of_pages'] = accumolators.get_number_of_pages(resume, ext)
+        
+        self.set_empty_attributes_to_none(details)
+        self.__local.details = details
+        
+        if hooks:
+            self.__stage('experience', start)
+        
+        # Collect reference cycles now and then (see `MemoryManager`)
+        self.__memory.after_parse()
+        
+        return details
+    
+    def _escalate(self, text, details, pretrained_output, fields=None):
+        """
+        Fills the fields of fast-tier details that the dictionaries and regexes left empty from the raw output
+        of the NER model (run by the caller, e.g. over a whole batch of resumes).
+        """
+        missing = self.__missing_model_fields(details, fields or cs.FIELDS)
+        if not missing:
+            return details
+        
+        document = TextDocument(text)
+        sections = document.sections if 'skills' in missing else {}
+        start = time.perf_counter() if self.__hooks else None
+        self.__extract_model_fields(details, document, sections, pretrained_output, missing, start)
+        self.set_empty_attributes_to_none(details)
+        
+        if self.__hooks:
+            self.__path('ner', 'escalated')
         
-        if valid_skills:
-            self.__details['skills'] = list(valid_skills)
-        elif 'skills' in entities:
-            # First Approach: Find skills in skills section
-            self.__details['skills'] = extractors.extract_skills('\n'.join(entities['skills']), self.__skill_set)
+        return details
+    
+    def __extract_model_fields(self, details, document, sections, pretrained_output, fields, start):
+        """
+        Extracts the given fields among those the NER model fills, from the raw output of the model
+        (None to use the dictionaries and regexes only). Returns the end time of the last stage.
+        """
+        hooks = self.__hooks
+        text = document.text
         
-        if not self.__details['skills']:
-            # Second Approach: Find skills in the whole document (Brute-Force)
-            self.__details['skills'] = extractors.extract_skills('\n'.join(self.__text_raw), self.__skill_set, cs.OBJECT_PATTERN)
+        # Model Outputs
+        pretrained_output = utils.preprocess_bert_output(pretrained_output) if pretrained_output is not None else []
+        cust_ent = extractors.extract_entities_wih_custom_model(pretrained_output)
+        
+        if hooks:
+            start = self.__stage('preprocess_bert_output', start)
+            self.__count('entities', len(pretrained_output))
+        
+        # Extract Skills
+        if 'skills' in fields:
+            skills = [ent['text'] for ent in pretrained_output if ent['entity'] == 'SKILL']
 
+            valid_skills = {skill for skill in skills if utils.preprocess_skill(skill) in self.__skill_set}
+            skills_path = 'ner'
+            
+            if valid_skills:
+                details['skills'] = list(valid_skills)
+            elif 'skills' in sections:
+                # First Approach: Find skills in skills section
+                details['skills'] = extractors.extract_skills(document.section_text('skills'), self.__skill_set)
+                skills_path = 'skills_section'
+            
+            if not details['skills']:
+                # Second Approach: Find skills in the whole document (Skill Index)
+                details['skills'] = extractors.find_skills(text, self.__skill_index)
+                skills_path = 'skill_index'
+            
+            if hooks:
+                start = self.__stage('skills', start)
+                self.__path('skills', skills_path)
         
         # Extract Name
-        if 'PER' in cust_ent:
-            self.__details['name'] = cust_ent['PER'][0].strip()
-        else:
-            name = self.__text_raw.split('\n')[0].strip()
-            self.__details['name'] = name
+        if 'name' in fields:
+            if 'PER' in cust_ent:
+                details['name'] = cust_ent['PER'][0].strip()
+            else:
+                name = document.line(0).strip()
+                details['name'] = name
         
         # Extract Academic Degree
-        if 'DEGREE' in cust_ent:
-            self.__details['degree'] = cust_ent['DEGREE'][0]
-        else:
-            self.__details['degree'] = extractors.extract_highest_degree(self.__text_raw)
+        if 'degree' in fields:
+            if 'DEGREE' in cust_ent:
+                details['degree'] = cust_ent['DEGREE'][0]
+            else:
+                details['degree'] = extractors.extract_highest_degree(text)
         
-        if 'ROLE' in cust_ent:
-            self.__details['role'] = cust_ent['ROLE']
+        if 'role' in fields and 'ROLE' in cust_ent:
+            details['role'] = cust_ent['ROLE']
         
         # Extract Locations
-        if 'LOC' in cust_ent:
-            self.__details['locations'] = list({loc for loc in cust_ent['LOC']})
+        if 'locations' in fields and 'LOC' in cust_ent:
+            details['locations'] = list({loc for loc in cust_ent['LOC']})
+        
+        if hooks:
+            start = self.__stage('entities', start)
+            if 'name' in fields:
+                self.__path('name', 'ner' if 'PER' in cust_ent else 'first_line')
+            if 'degree' in fields:
+                self.__path('degree', 'ner' if 'DEGREE' in cust_ent else 'regex')
         
         # Extract Company Names
-        if 'COMPANY' in cust_ent:
-            self.__details['companies'] = [company for company in cust_ent['COMPANY']]
-        else:
-            self.__details['companies'] = extractors.extract_companies(self.__text_raw, list(self.__company_set))
+        if 'companies' in fields:
+            if 'COMPANY' in cust_ent:
+                details['companies'] = [company for company in cust_ent['COMPANY']]
+            else:
+                details['companies'] = extractors.extract_companies(text, self.__company_matcher)
+            
+            if hooks:
+                start = self.__stage('companies', start)
+                self.__path('companies', 'ner' if 'COMPANY' in cust_ent else 'dictionary')
         
         # Extract College Name
-        if 'INSTITUTION' in cust_ent:
-            self.__details['college'] = cust_ent['INSTITUTION']
-        else:
-            self.__details['college'] = extractors.extract_college(self.__text_raw)
-        
-        # Calculate Total Experience
-        if 'experience' in entities:
-            # Get Experience in Months
-            total_exp = accumolators.get_total_experience(entities['experience'])
+        if 'college' in fields:
+            if 'INSTITUTION' in cust_ent:
+                details['college'] = cust_ent['INSTITUTION']
+            else:
+                details['college'] = extractors.extract_college(text)
             
-            # Calculate Experience in Years
-            self.__details['experience'] = round(total_exp / 12, 2) if total_exp else 0
-        else:
-            self.__details['experience'] = 0
-        
-        if ext:
-            self.__details['format'] = ext
-            self.__details['no_of_pages'] = accumolators.get_number_of_pages(resume, ext)
-        
-        self.set_empty_attributes_to_none()
-        
-        # To prevent memory leaks
-        del resume
-        gc.collect()
+            if hooks:
+                start = self.__stage('college', start)
+                self.__path('college', 'ner' if 'INSTITUTION' in cust_ent else 'regex')
         
-        return self.get_extracted_data()
+        return start
+    
+    def __stage(self, stage, start):
+        # Reports the end of a stage to the hooks and returns the current time
+        now = time.perf_counter()
+        for hook in self.__hooks:
+            hook.on_stage(stage, now - start)
+        return now
+    
+    def __count(self, counter, value):
+        for hook in self.__hooks:
+            hook.on_counter(counter, value)
+    
+    def __path(self, field, path):
+        for hook in self.__hooks:
+            hook.on_path(field, path)
 
-    def set_empty_attributes_to_none(self):
+    def set_empty_attributes_to_none(self, details=None):
         """
-        Sets any empty attributes in __details dictionary to None
+        Sets any empty attributes in the given details (by default, the last ones extracted in this thread) to None
         """
-        for key in self.__details:
-            if not self.__details[key]:
-                self.__details[key] = None
\ No newline at end of file
+        if details is None:
+            details = self.get_extracted_data()
+        
+        for key in details:
+            if not details[key]:
+                details[key] = None
\ No newline at end of file
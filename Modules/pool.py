@@ -0,0 +1,110 @@
+import os
+import gc
+import multiprocessing
+
+from .parser import ResumeParser
+
+
+# Parser of the worker processes, inherited from the parent process by `fork`
+_parser = None
+
+# Number of open pools: `gc.freeze` is process-wide, only the last pool closed unfreezes
+_frozen_pools = 0
+
+
+def _init_worker():
+    # The SQLite connections of the cache and near-duplicate index cannot be shared with the parent process
+    _parser._reopen()
+
+    # Every worker already runs on its own core, one intra-op thread each avoids oversubscription
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _parse(resume):
+    return _parser.parse(resume)
+
+
+class ParserPool(object):
+    '''
+    Pool of worker processes sharing one preloaded `ResumeParser`.
+
+    The parser (NER model, skill and company dictionaries) is loaded once
+    in the parent process, then the workers are forked: the model weights
+    and dictionaries are shared copy-on-write instead of being loaded again
+    by every worker. Text extraction, NER and the regex stages of different
+    resumes run on different cores, and results keep the input order.
+    '''
+
+    def __init__(self, processes: int = None, parser: ResumeParser = None, **parser_kwargs):
+        global _parser, _frozen_pools
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError("ParserPool needs the 'fork' start method, which this platform does not support")
+
+        _parser = parser if parser is not None else ResumeParser(**parser_kwargs)
+        _parser.warmup()
+
+        # The fast tokenizer's own thread pool does not survive a fork
+        os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+        # Keep the loaded objects out of the garbage collector, so the workers' collections
+        # do not write to (and copy) the pages they share with the parent process
+        gc.collect()
+        gc.freeze()
+        _frozen_pools += 1
+        self.__frozen = True
+
+        context = multiprocessing.get_context('fork')
+        self.__pool = context.Pool(processes, initializer=_init_worker)
+
+    def __unfreeze(self):
+        global _frozen_pools
+
+        if self.__frozen:
+            self.__frozen = False
+            _frozen_pools -= 1
+            if _frozen_pools == 0:
+                gc.unfreeze()
+
+    def imap(self, resumes, chunksize: int = 1):
+        '''
+        Parses the given resumes in the worker processes
+
+        :param resumes: iterable of resume file paths, file-like objects or texts
+        :param chunksize: number of resumes sent to a worker at once
+        :return: iterator over the extracted details, in the input order
+        '''
+        return self.__pool.imap(_parse, resumes, chunksize)
+
+    def parse_many(self, resumes, chunksize: int = 1) -> list[dict]:
+        '''
+        Parses the given resumes in the worker processes
+
+        :param resumes: iterable of resume file paths, file-like objects or texts
+        :param chunksize: number of resumes sent to a worker at once
+        :return: list of the extracted details, in the input order
+        '''
+        return list(self.imap(resumes, chunksize))
+
+    def close(self):
+        '''
+        Waits for the pending resumes and stops the worker processes
+        '''
+        self.__pool.close()
+        self.__pool.join()
+        self.__unfreeze()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__unfreeze()
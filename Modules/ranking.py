@@ -0,0 +1,216 @@
+import itertools
+import numpy as np
+import scipy.sparse
+
+from . import utils
+from . import extractors
+from . import dictionaries
+from . import constants as cs
+
+
+# Degree levels, from 1 (high school) to 5 (PhD), 0 when unknown
+DEGREE_LEVELS = {name: len(cs.DEGREE_RANKS) - rank for rank, name in enumerate(cs.DEGREE_RANKS.values())}
+
+
+def get_degree_level(degree: str) -> int:
+    '''
+    Helper function to get the level of a parsed degree (display name, or degree text found by the NER model)
+
+    :param degree: degree of the parsed details
+    :return: level from 1 (high school) to 5 (PhD), 0 when unknown
+    '''
+    if not degree:
+        return 0
+    if degree in DEGREE_LEVELS:
+        return DEGREE_LEVELS[degree]
+
+    return DEGREE_LEVELS.get(extractors.extract_highest_degree(degree), 0)
+
+
+class Vocabulary(object):
+    '''
+    Column index of every known value (in its no-space lower-case form for the skills)
+
+    The values are normalized once: the column (or -1) of every value met
+    is remembered, as parsed resumes repeat the same skills as written.
+    '''
+
+    def __init__(self, values, normalize=None):
+        self.__normalize = normalize
+        self.__index = {value: i for i, value in enumerate(sorted(values))}
+        self.__seen = {}
+
+    def __len__(self):
+        return len(self.__index)
+
+    def __column(self, value) -> int:
+        column = self.__index.get(value if self.__normalize is None else self.__normalize(value), -1)
+        self.__seen[value] = column
+        return column
+
+    def columns(self, values) -> list[int]:
+        '''
+        Returns the column index of every value, -1 for the unknown ones (duplicates kept)
+        '''
+        if not values:
+            return []
+
+        columns = list(map(self.__seen.get, values))
+        if None in columns:
+            seen, column = self.__seen, self.__column
+            columns = [seen[value] if value in seen else column(value) for value in values]
+        return columns
+
+    def indices(self, values) -> list[int]:
+        '''
+        Returns the sorted column indices of the known values (unknown values are left out)
+        '''
+        return sorted(set(self.columns(values)) - {-1})
+
+
+class CandidateRanker(object):
+    '''
+    Ranks parsed resumes against job openings.
+
+    Every candidate is a row of two sparse binary matrices (skills of
+    `skills.csv`, companies of `companies.csv`) and of two arrays (degree
+    level, years of experience). The matrices are stored by column (CSC),
+    so a job is scored against all the candidates at once by summing the
+    columns of its skills only, and the best `k` are selected with
+    `numpy.argpartition`. Added candidates are buffered and stacked onto
+    the matrices once, on the next `rank` call.
+
+    Each criterion scores from 0 to 1 and is weighted by `weights` (see
+    `constants.RANKING_WEIGHTS`); the criteria a job does not set are left
+    out and the other weights are scaled to sum to 1:
+    - skills: share of the job skills the candidate has
+    - experience: years of experience over the minimum (at most 1)
+    - degree: 1 when the degree level is at least the required one
+    - companies: share of the preferred companies the candidate mentions
+    '''
+
+    def __init__(self,
+                 skills_file= cs.workspace_dir +'/Data/skills.csv',
+                 companies_file= cs.workspace_dir +'/Data/companies.csv',
+                 weights= None):
+        self.__skills = Vocabulary(dictionaries.load_dictionary(skills_file, 'Skill'), utils.preprocess_skill)
+        self.__companies = Vocabulary(dictionaries.load_dictionary(companies_file, 'Company'))
+        self.__weights = dict(cs.RANKING_WEIGHTS, **(weights or {}))
+
+        self.__ids = []
+        self.__skill_matrix = scipy.sparse.csc_matrix((0, len(self.__skills)), dtype=np.float32)
+        self.__company_matrix = scipy.sparse.csc_matrix((0, len(self.__companies)), dtype=np.float32)
+        self.__degree_levels = np.zeros(0, dtype=np.int8)
+        self.__years = np.zeros(0, dtype=np.float32)
+
+        # Candidates added since the last stacking: (skill indices, company indices, degree level, years)
+        self.__pending = []
+
+    def __len__(self):
+        return len(self.__ids)
+
+    def add(self, candidate_id, details: dict):
+        '''
+        Adds a candidate from its parsed details (`ResumeParser.parse` output)
+
+        :param candidate_id: identifier returned by `rank`
+        :param details: parsed details, the skills, companies, degree and experience are used
+        '''
+        self.__ids.append(candidate_id)
+        self.__pending.append((self.__skills.columns(details.get('skills')),
+                               self.__companies.columns(details.get('companies')),
+                               get_degree_level(details.get('degree')),
+                               details.get('experience') or 0))
+
+    def add_many(self, candidates):
+        '''
+        Adds several candidates
+
+        :param candidates: iterable of (candidate id, parsed details) pairs (e.g. `stream_resumes` results)
+        '''
+        for candidate_id, details in candidates:
+            self.add(candidate_id, details)
+
+    def __stack_pending(self):
+        if not self.__pending:
+            return
+
+        skills, companies, degree_levels, years = zip(*self.__pending)
+        self.__skill_matrix = scipy.sparse.vstack(
+            [self.__skill_matrix, self.__to_matrix(skills, len(self.__skills))], format='csc')
+        self.__company_matrix = scipy.sparse.vstack(
+            [self.__company_matrix, self.__to_matrix(companies, len(self.__companies))], format='csc')
+        self.__degree_levels = np.concatenate([self.__degree_levels, np.array(degree_levels, dtype=np.int8)])
+        self.__years = np.concatenate([self.__years, np.array(years, dtype=np.float32)])
+        self.__pending = []
+
+    @staticmethod
+    def __to_matrix(rows, columns: int):
+        # Binary CSR matrix of the column indices of every row (unknown values and duplicates dropped)
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        row_indices = np.repeat(np.arange(len(rows)), lengths)
+        column_indices = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int32, count=lengths.sum())
+
+        known = column_indices >= 0
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_indices[known], minlength=len(rows)), out=indptr[1:])
+
+        matrix = scipy.sparse.csr_matrix((np.ones(indptr[-1], dtype=np.float32), column_indices[known], indptr),
+                                         shape=(len(rows), columns))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix.tocsc()
+
+    def scores(self, skills=None, min_years: float = 0, degree: str = None, companies=None) -> np.ndarray:
+        '''
+        Scores every candidate against a job
+
+        :param skills: skills of the job (unknown skills are left out)
+        :param min_years: minimum years of experience
+        :param degree: minimum degree (`constants.DEGREE_RANKS` display name, or degree text)
+        :param companies: preferred companies
+        :return: score of every candidate from 0 to 1, in the order they were added
+        '''
+        self.__stack_pending()
+
+        skill_indices = self.__skills.indices(skills)
+        company_indices = self.__companies.indices(companies)
+        degree_level = get_degree_level(degree)
+
+        criteria = []
+        if skill_indices:
+            criteria.append(('skills', self.__share(self.__skill_matrix, skill_indices)))
+        if min_years:
+            criteria.append(('experience', np.minimum(self.__years / min_years, 1)))
+        if degree_level:
+            criteria.append(('degree', (self.__degree_levels >= degree_level).astype(np.float32)))
+        if company_indices:
+            criteria.append(('companies', self.__share(self.__company_matrix, company_indices)))
+
+        scores = np.zeros(len(self.__ids), dtype=np.float32)
+        total_weight = sum(self.__weights[name] for name, _ in criteria)
+        for name, values in criteria:
+            scores += values * (self.__weights[name] / total_weight)
+
+        return scores
+
+    @staticmethod
+    def __share(matrix, indices: list[int]) -> np.ndarray:
+        # Share of the given columns each row has (only these columns of the CSC matrix are read)
+        return np.asarray(matrix[:, indices].sum(axis=1), dtype=np.float32).ravel() / len(indices)
+
+    def rank(self, skills=None, min_years: float = 0, degree: str = None, companies=None, k: int = 10) -> list[tuple]:
+        '''
+        Returns the best `k` candidates for a job (see `scores` for the job criteria)
+
+        :return: list of (candidate id, score) pairs, the best first (ties in the order the candidates were added)
+        '''
+        scores = self.scores(skills, min_years, degree, companies)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+
+        best = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        best = best[np.lexsort((best, -scores[best]))]
+
+        return [(self.__ids[i], float(scores[i])) for i in best]
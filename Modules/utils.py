@@ -1,6 +1,6 @@
 import io
-import re
-from .constants import EMAIL_PATTERN
+import csv
+from .constants import EMAIL_REGEX
 
 def load_to_memory(file):
     with open(file, 'rb') as memory_file:
@@ -9,16 +9,31 @@ def load_to_memory(file):
     
     return memory_file
 
+def load_csv_column(path, column):
+    '''
+    Loads the non-empty values of a column of a CSV file into a set
+    '''
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        reader = csv.reader(csv_file)
+        index = next(reader).index(column)
+        return {row[index] for row in reader if len(row) > index and row[index]}
+
 def validate_link(link):
     if link.startswith("mailto:") or link.startswith("tel:") or link.startswith("sms:"):
         return False
 
-    if re.match(EMAIL_PATTERN, link):
+    if EMAIL_REGEX.match(link):
         return False
     
     return True
 
 def encode_text(doc):
+    '''
+    Helper function to replace the non-ASCII characters (and '?') of a text by '-'
+
+    Length-preserving: every character is replaced by exactly one character,
+    so the offsets in the result (e.g. NER `start`/`end`) also hold in `doc`.
+    '''
     return doc.encode('ascii', 'replace').decode('ascii').replace('?', '-')
 
 def preprocess_skill(skill):
@@ -43,13 +58,14 @@ def preprocess_bert_output(results):
 
         new = True
         
-        if word.startswith('##') and start - output[-1]['end'] < 2 and output[-1]['entity'] == entity:
+        # A continuation can come first (e.g. from a quantized model), it then starts a new entity
+        if output and word.startswith('##') and start - output[-1]['end'] < 2 and output[-1]['entity'] == entity:
             new = False
             word = word[2:]
             output[-1]['text'] += word
             output[-1]['end'] = end
             
-        elif (etype == 'I' or word.lower() == 'skills') and output[-1]['entity'] == entity:
+        elif output and (etype == 'I' or word.lower() == 'skills') and output[-1]['entity'] == entity:
             new = False
             word = ' ' + word
             output[-1]['text'] += word
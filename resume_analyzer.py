@@ -1,4 +1,17 @@
 from Modules.parser import ResumeParser
+from Modules.pool import ParserPool
+from Modules.ingest import stream_parse
 
-def init_parser() -> ResumeParser:
-    return ResumeParser()
+def init_parser(**kwargs) -> ResumeParser:
+    return ResumeParser(**kwargs)
+
+def init_pool(processes: int = None, **kwargs) -> ParserPool:
+    return ParserPool(processes, **kwargs)
+
+def stream_resumes(source: str, output: str = None, checkpoint: str = None, parser: ResumeParser = None, **kwargs):
+    return stream_parse(parser if parser is not None else init_parser(), source, output, checkpoint, **kwargs)
+
+def init_client(path: str = None):
+    # The daemon module needs Unix sockets, it is only imported by its clients
+    from Modules.daemon import DaemonClient
+    return DaemonClient(path)
\ No newline at end of file